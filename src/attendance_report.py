@@ -1,31 +1,18 @@
-
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+import multiprocessing
 import os
 import sys
-from openpyxl import Workbook
-import pandas as pd
-from logger import logger 
-from fetcher import fetching_report
-from utils import open_excel, get_valid_date
-from writer import write_report
-
-
-# ===== User input =======
-date = get_valid_date()
-def preparing_excel(file_name: str):
-    wb = None
-    try: 
-        if os.path.isfile(file_name):
-            os.remove(file_name)
-        wb = Workbook()        
-        wb.save(file_name)
-        return wb
-    except Exception as e:
-        logger.error(f"Unable to open or create excel\nError: {e}")
-        return None
- 
- 
-def get_or_create_worksheet(wb: Workbook, sheet_name: str):
+from logger import flush_logs, logger, setup_logging
+from fetcher import build_report, fetch_range, fetching_report
+from metrics import stage, start_run, write_run_summary
+from utils import open_excel, get_empl_working_hours, get_valid_date
+
+# writer (openpyxl) and the classifier (pandas) are imported on first use,
+# after the date prompt, see startup_report.py
+
+
+def get_or_create_worksheet(wb, sheet_name: str):
     if sheet_name in wb.sheetnames:
         ws = wb[sheet_name]
     else:
@@ -33,50 +20,106 @@ def get_or_create_worksheet(wb: Workbook, sheet_name: str):
     return ws
 
 
+def save_daily_report(report: dict, out_dir: str = ".") -> str:
+    """Write one day's report as 'Daily Report dd-mm-yyyy.xlsx' in out_dir and return the path."""
+    from writer import report_sections, write_report_streaming
+
+    date = datetime.fromisoformat(f"{report["report_date"]}")
+    file_name = os.path.join(out_dir, f"Daily Report {date.strftime("%d-%m-%Y")}.xlsx")
+
+    # Writing every report section in one streamed (write-only) sheet
+    write_report_streaming(file_name, report_sections(report))
+    return file_name
+
+
+# --- Range mode: one fetch, one worker process per day ---
+def _report_worker(job) -> str:
+    """Runs in a pool process: classify one day's rows and write its workbook."""
+    rows, shifts, grace_min, out_dir = job
+    return save_daily_report(build_report(rows, grace_min, shifts), out_dir)
+
+
+def split_by_day(rows: list[dict]) -> dict:
+    """{date: rows} in date order, keyed on Att_month."""
+    days = {}
+    for entry in rows:
+        days.setdefault(entry["Att_month"].date(), []).append(entry)
+    return dict(sorted(days.items()))
+
+
+def generate_range_reports(start_date: str, end_date: str, grace_min=20, out_dir=".", workers=None) -> list[str]:
+    """
+    Daily reports for every date from start_date to end_date (mm/dd/yyyy, both
+    inclusive). The period is fetched once; classification and workbook
+    generation run per day in a process pool.
+    """
+    start = datetime.strptime(start_date, "%m/%d/%Y")
+    end = datetime.strptime(end_date, "%m/%d/%Y") + timedelta(days=1)
+
+    with stage("fetch_range", start=start_date, end=end_date) as s:
+        days = split_by_day(fetch_range(start, end))
+        s.update(rows=sum(len(rows) for rows in days.values()), days=len(days))
+    if not days:
+        logger.warning(f"No attendance data found between {start_date} and {end_date}.")
+        return []
+
+    # Roster lookup once in the parent, workers only get their day's slice
+    all_shifts = get_empl_working_hours({entry["employee_code"] for rows in days.values() for entry in rows})
+    jobs = [
+        (rows, {entry["employee_code"]: all_shifts[entry["employee_code"]] for entry in rows}, grace_min, out_dir)
+        for rows in days.values()
+    ]
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    logger.info(f"Generating {len(jobs)} daily reports with {workers} worker processes")
+    with stage("generate_reports", days=len(jobs), workers=workers):
+        if workers == 1:
+            return [_report_worker(job) for job in jobs]
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_report_worker, jobs))
+
+
+def daily_report(date: str):
+    # Fetching and analyzing attendance data
+    daily_report_data = fetching_report(date) 
+
+    try:
+        file_name = save_daily_report(daily_report_data)
+    except Exception as e:
+        logger.error(f"Unable to open or create excel\nError: {e}")
+        flush_logs()
+        input("Script exit error with code 1")
+        sys.exit()
+
+    logger.info(f"Report saved successfully at")
+    write_run_summary(file_name)
+    open_excel(file_name)
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # pool workers in the PyInstaller build
+    setup_logging()
     try: 
-    
-        # Fetching and analyzing attendance data
-        daily_report_data = fetching_report(date) 
-        reports = list(daily_report_data.keys())
-        date = datetime.fromisoformat(f"{daily_report_data["report_date"]}")
-
-        file_name = f"Daily Report {date.strftime("%d-%m-%Y")}.xlsx"
-        
-        # preparting a excel to write data
-        wb = preparing_excel(file_name)
-        if wb == None:
-            input("Script exit error with code 1")
-            sys.exit()
-        
-        # Writing each report in seprate excel sheet
-        for report_type in reports:
-            if report_type == 'report_date':  # skipping for date
-                continue 
-            
-            # Finding report data for each report 
-            report_data = daily_report_data[report_type]
-            dataColumns = list(report_data[0].keys())
-            
-            logger.info(f"Writing report for {report_type}")
-            ws = wb.active
-            
-            # setting up sheet view and style
-            ws.sheet_view.showGridLines = False
-            write_report(
-                ws=ws,
-            title= f"{report_type.replace("_", " ").capitalize()}", 
-            data_columns= dataColumns, 
-            data=report_data
-            )
-        
-        wb.save(file_name)
-        logger.info(f"Report saved successfully at")
-        open_excel(file_name)
+        # ===== User input =======
+        print("1. Single date")
+        print("2. Date range (one report per day)")
+        flush_logs()
+        choice = input("Select an option: ").strip()
+        start_run()
+
+        if choice == "2":
+            print("Start date")
+            start_date = get_valid_date()
+            print("End date")
+            end_date = get_valid_date()
+            files = generate_range_reports(start_date, end_date)
+            logger.info(f"{len(files)} reports saved: {files}")
+            write_run_summary(f"Daily Reports {start_date.replace('/', '-')} to {end_date.replace('/', '-')}")
+        else:
+            daily_report(get_valid_date())
+
+        flush_logs()
         input("Report is ready (Press Enter to close): ")
     except Exception as e:
         logger.error(f"Report generation fail: {e}")
-
-        
\ No newline at end of file
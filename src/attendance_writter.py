@@ -1,61 +1,88 @@
 import platform
 from datetime import datetime
-import pandas as pd
-from logger import logger 
-from fetcher import fetch_attendance, fetch_month_attendance, update_employee
+from logger import flush_logs, logger, setup_logging
+from metrics import start_run, write_run_summary
 from utils import get_valid_date, get_valid_month
-from writer import write_to_excel
+
+# Heavy modules (pandas via fetcher/writer, openpyxl) are imported inside the
+# menu option that needs them, so the menu shows up right away.
+# startup_report.py measures the import cost of every option.
 
 print(platform.architecture())
 
-def get_excel_path():
+def get_excel_path(prompt="Give file path of excel to write: "):
     #  ====== User inputs ======
-    excile_path = input("Give file path of excel to write: ")
+    flush_logs()
+    excile_path = input(prompt)
 
     if excile_path.startswith("\"") and excile_path.endswith("\""):
         excile_path = excile_path[1:len(excile_path)-1]
         
     print("excile_path", excile_path)
+    return excile_path
 
 if __name__ == "__main__":
+    setup_logging()
     try:
+        flush_logs()
         menu_option = int(input("""
 1). Mark attendance for a day.
 2). Mark attendance for a month.
 3). Update employee data.
+4). Apply corrections from a CSV/JSON file.
 Select from Above Menu:  
         """))
+        start_run()  # the summary times this option, not the time spent in the menu
         
         match menu_option:
             case 1:
+                from fetcher import fetch_attendance
+                from writer import write_to_excel
                 date = get_valid_date()
                 attd_data = fetch_attendance(date)
                 
                 if attd_data == [] or len(attd_data) == 0:
                     logger.info("No Data found (Press Enter to close): ")
+                    flush_logs()
                     input("")
                 else:
                     excile_path = get_excel_path()
-                    write_to_excel(attd_data, excile_path)
+                    write_run_summary(write_to_excel(attd_data, excile_path))
+                    flush_logs()
                     input("Attendance marking is complete (Press Enter to close): ")
                     
             case 2:
+                from fetcher import iter_month_attendance
+                from metrics import counted
+                from pipeline import prefetch
+                from writer import write_batches_to_excel
                 month = get_valid_month()
-                attd_data = fetch_month_attendance(month)
-                if attd_data == [] or len(attd_data) == 0:
-                    logger.info("No Data found (Press Enter to close): ")
-                    input("")
-                else:
-                    excile_path = get_excel_path()
-                    write_to_excel(attd_data, excile_path)
-                    input("Attendance marking is complete (Press Enter to close): ")
+                excile_path = get_excel_path()
+                
+                # Rows are classified and written batch by batch while the next
+                # batch is fetched in the background; the month totals go to
+                # the "Summary <MON>" sheet
+                batches = counted("fetch_month_attendance", iter_month_attendance(month), month=month)
+                write_run_summary(write_batches_to_excel(prefetch(batches), excile_path, summary=True))
+                flush_logs()
+                input("Attendance marking is complete (Press Enter to close): ")
                     
             case 3:
+                from fetcher import update_employee
+                flush_logs()
                 employee_code = int(input("Enter employee id: "))
                 date = datetime.strptime("10/12/2025", "%m/%d/%Y")
                 # employee_code = int(input("Enter employee code: "))
                 # date = get_valid_date()
                 update_employee(employee_code, date)
+
+            case 4:
+                from corrections import apply_corrections
+                corrections_path = get_excel_path("Give file path of corrections (.csv/.json): ")
+                apply_corrections(corrections_path)
+                write_run_summary("Corrections Report.xlsx")
+                flush_logs()
+                input("Corrections are complete (Press Enter to close): ")
             
             case _:
                 logger.error("Inavlid input try again\n")
@@ -63,4 +90,5 @@ Select from Above Menu:
         
     except Exception as e:
         logger.error(e)
+        flush_logs()
         input("Press Enter to close")
\ No newline at end of file
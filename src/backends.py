@@ -0,0 +1,105 @@
+import sqlite3
+from datetime import datetime
+
+
+# Columns that hold date/times in FinalDay_Attendance
+DATETIME_COLUMNS = {"In_time", "Out_time", "Att_month"}
+
+
+class AccessBackend:
+    """Production backend: the attendance machine's .mdb over the Access ODBC driver."""
+    name = "access"
+
+    def connect(self, db_path, password=None):
+        import pyodbc  # only needed (and only installable) on the Windows terminals
+        conn_str = (
+            r'DRIVER={Microsoft Access Driver (*.mdb, *.accdb)};'
+            rf'DBQ={db_path};'
+            rf'PWD={password};'
+        )
+        return pyodbc.connect(conn_str)
+
+    def is_alive(self, conn) -> bool:
+        """Cheap health check: a catalog lookup, no table scan."""
+        try:
+            cursor = conn.cursor()
+            cursor.tables(table="employees").fetchone()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def execute(self, cursor, query, params=()):
+        return cursor.execute(query, params)
+
+    def executemany(self, cursor, query, seq_of_params):
+        # No fast_executemany: the Access ODBC driver doesn't reliably support parameter arrays
+        return cursor.executemany(query, seq_of_params)
+
+    def fetchmany(self, cursor, size):
+        return cursor.fetchmany(size)
+
+    def fetchone(self, cursor):
+        return cursor.fetchone()
+
+    def fetchall(self, cursor):
+        return cursor.fetchall()
+
+
+class SQLiteBackend(AccessBackend):
+    """
+    Same FinalDay_Attendance / employees schema in an SQLite file.
+    Used for local measurements and tests (see synthetic.py); date/times are
+    stored as ISO text and converted back to datetime on the way out.
+    """
+    name = "sqlite"
+
+    def connect(self, db_path, password=None):
+        return sqlite3.connect(db_path, check_same_thread=False)
+
+    def is_alive(self, conn) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _param(value):
+        return value.isoformat(sep=" ") if isinstance(value, datetime) else value
+
+    def execute(self, cursor, query, params=()):
+        return cursor.execute(query, tuple(self._param(value) for value in params))
+
+    def executemany(self, cursor, query, seq_of_params):
+        return cursor.executemany(query, [tuple(self._param(value) for value in params) for params in seq_of_params])
+
+    def _convert(self, cursor, rows):
+        columns = [i for i, column in enumerate(cursor.description) if column[0] in DATETIME_COLUMNS]
+        if not columns:
+            return rows
+
+        converted = []
+        for row in rows:
+            row = list(row)
+            for i in columns:
+                if isinstance(row[i], str) and row[i]:
+                    row[i] = datetime.fromisoformat(row[i])
+            converted.append(tuple(row))
+        return converted
+
+    def fetchmany(self, cursor, size):
+        return self._convert(cursor, cursor.fetchmany(size))
+
+    def fetchone(self, cursor):
+        row = cursor.fetchone()
+        return None if row is None else self._convert(cursor, [row])[0]
+
+    def fetchall(self, cursor):
+        return self._convert(cursor, cursor.fetchall())
+
+
+BACKENDS = {
+    AccessBackend.name: AccessBackend(),
+    SQLiteBackend.name: SQLiteBackend(),
+}
@@ -0,0 +1,236 @@
+"""
+Headless batch runner: many dates, months and workbooks in one process, no prompts.
+
+    python batch.py --month 10/2025 --register "D:\\Registers\\October.xlsx"
+    python batch.py --day 10/06/2025 --day 10/07/2025 --register October.xlsx --report 10/07/2025
+    python batch.py --jobs nightly.json
+
+A job file is a JSON list of jobs (or {"config": {...}, "roster": "...", "jobs": [...]}):
+
+    [
+        {"type": "month", "month": "10/2025", "register": "October.xlsx", "summary": true},
+        {"type": "day", "date": "10/07/2025", "register": "October.xlsx"},
+        {"type": "report", "date": "10/07/2025", "out_dir": "reports"},
+        {"type": "report_range", "start": "10/01/2025", "end": "10/31/2025", "out_dir": "reports"},
+        {"type": "corrections", "path": "fixes.csv"}
+    ]
+
+The database connection, the roster and every register workbook are opened
+once and shared by all jobs. Each register is saved once at the end, and only
+when some cell changed and no job failed while marking it. The exit code is 1
+when any job failed.
+"""
+import argparse
+import json
+import os
+import sys
+from logger import logger, setup_logging
+from metrics import counted, stage, start_run, write_run_summary
+from utils import close_all_connections, close_excel_if_open, config, parse_date, parse_month
+
+
+JOB_TYPES = ("day", "month", "report", "report_range", "corrections")
+
+
+def _clean_path(path: str) -> str:
+    path = str(path).strip().strip('"')
+    return path if path.startswith(("http://", "https://")) else os.path.abspath(path)
+
+
+def _get_register(registers: dict, path: str) -> dict:
+    """Each register workbook is loaded and indexed once per batch."""
+    from writer import open_register
+
+    path = _clean_path(path)
+    if path not in registers:
+        register = open_register(path)
+        if register is None:
+            raise FileNotFoundError(f"Unable to open register: {path}")
+        registers[path] = register
+    return registers[path]
+
+
+def _mark(register: dict, batches, summary=False) -> int:
+    """Mark every batch into the register, timed as write_to_excel like the interactive path."""
+    from writer import mark_batch, write_month_summary
+
+    rows = 0
+    with stage("write_to_excel", path=register["path"]) as s:
+        for batch in batches:
+            if not mark_batch(register, batch):
+                raise ValueError(f"Attendance month does not match sheet month {register['sheet_month']}")
+            rows += len(batch)
+        if summary and rows:
+            register["counts"]["cells_updated"] += write_month_summary(register)
+        s["rows"] = rows
+    return rows
+
+
+def run_job(job: dict, registers: dict) -> dict:
+    """Run one job; returns what it produced (rows, files, ...)."""
+    kind = job.get("type")
+
+    if kind == "day":
+        from fetcher import iter_attendance
+        date = parse_date(job["date"])
+        batches = counted("fetch_attendance", iter_attendance(date), date=date)
+        return {"rows": _mark(_get_register(registers, job["register"]), batches)}
+
+    if kind == "month":
+        from fetcher import iter_month_attendance
+        from pipeline import prefetch
+        month = parse_month(job["month"])
+        register = _get_register(registers, job["register"])
+        register["summary_parts"] = []  # summary of this month only, not of earlier jobs
+        batches = counted("fetch_month_attendance", iter_month_attendance(month), month=month)
+        return {"rows": _mark(register, prefetch(batches), summary=job.get("summary"))}
+
+    if kind == "report":
+        from attendance_report import save_daily_report
+        from fetcher import fetching_report
+        report = fetching_report(parse_date(job["date"]), job.get("grace_min", 20))
+        if not report:
+            return {"files": []}
+        out_dir = job.get("out_dir", ".")
+        os.makedirs(out_dir, exist_ok=True)
+        return {"files": [save_daily_report(report, out_dir)]}
+
+    if kind == "report_range":
+        from attendance_report import generate_range_reports
+        out_dir = job.get("out_dir", ".")
+        os.makedirs(out_dir, exist_ok=True)
+        files = generate_range_reports(
+            parse_date(job["start"]), parse_date(job["end"]),
+            grace_min=job.get("grace_min", 20), out_dir=out_dir, workers=job.get("workers"),
+        )
+        return {"files": files}
+
+    if kind == "corrections":
+        from corrections import apply_corrections
+        report_file = job.get("report", "Corrections Report.xlsx")
+        result = apply_corrections(_clean_path(job["path"]), report_file=report_file, dry_run=job.get("dry_run", False))
+        return {"applied": len(result["applied"]), "skipped": len(result["skipped"]), "files": [report_file]}
+
+    raise ValueError(f"Unknown job type {kind!r}, expected one of {', '.join(JOB_TYPES)}")
+
+
+def save_registers(registers: dict, failed=()) -> list[str]:
+    """
+    Save every register some job changed; untouched ones are left alone, and
+    so are the paths in failed (a job stopped partway through marking them).
+    """
+    from writer import save_register
+
+    saved = []
+    for path, register in registers.items():
+        if path in failed:
+            logger.error(f"Register not saved, a job failed while marking it: {path}")
+            continue
+        if not register["counts"]["cells_updated"]:
+            logger.info(f"Register unchanged, not saved: {path}")
+            continue
+        close_excel_if_open(path)
+        save_register(register, open_after=False)
+        saved.append(path)
+    return saved
+
+
+def run_jobs(jobs: list[dict]) -> list[dict]:
+    """
+    Run every job in order in this process. A failing job is logged and
+    recorded, the rest still run; registers are saved after the last job,
+    except the ones a failed job was marking.
+    The stages of all jobs go to one run summary.
+    """
+    start_run()
+    registers = {}
+    results = []
+    failed = set()
+
+    for number, job in enumerate(jobs, start=1):
+        result = {"job": number, **job}
+        try:
+            with stage(f"job:{job.get('type')}", job=number):
+                result.update(run_job(job, registers), ok=True)
+        except Exception as e:
+            logger.error(f"Job {number} ({job.get('type')}) failed: {e}")
+            result.update(ok=False, error=str(e))
+            if job.get("register"):
+                failed.add(_clean_path(job["register"]))
+        results.append(result)
+
+    saved = save_registers(registers, failed)
+    for result in results:
+        if result.get("register"):
+            result["saved"] = _clean_path(result["register"]) in saved
+    return results
+
+
+def jobs_from_args(args) -> list[dict]:
+    jobs = []
+    if args.jobs:
+        with open(args.jobs, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            config.update(data.get("config", {}))
+            if data.get("roster"):
+                import roster
+                roster.use_roster_file(data["roster"])
+            data = data.get("jobs", [])
+        jobs.extend(data)
+
+    if (args.day or args.month) and not args.register:
+        raise SystemExit("--day / --month need --register")
+    jobs += [{"type": "day", "date": date, "register": args.register} for date in args.day]
+    jobs += [{"type": "month", "month": month, "register": args.register, "summary": args.summary_sheet} for month in args.month]
+    jobs += [{"type": "report", "date": date, "out_dir": args.out_dir} for date in args.report]
+    if args.report_range:
+        start, end = args.report_range
+        jobs.append({"type": "report_range", "start": start, "end": end, "out_dir": args.out_dir})
+    jobs += [{"type": "corrections", "path": path} for path in args.corrections]
+    return jobs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run attendance jobs without prompts.")
+    parser.add_argument("--jobs", default=None, help="JSON job file")
+    parser.add_argument("--day", action="append", default=[], help="mark one date (mm/dd/yyyy) into --register")
+    parser.add_argument("--month", action="append", default=[], help="mark a month (mm/yyyy) into --register")
+    parser.add_argument("--summary-sheet", action="store_true", help="also write the 'Summary <MON>' sheet for --month")
+    parser.add_argument("--register", default=None, help="register workbook for --day / --month")
+    parser.add_argument("--report", action="append", default=[], help="daily report for a date (mm/dd/yyyy)")
+    parser.add_argument("--report-range", nargs=2, metavar=("START", "END"), help="one daily report per date")
+    parser.add_argument("--corrections", action="append", default=[], help="apply a corrections CSV/JSON file")
+    parser.add_argument("--out-dir", default=".", help="where daily reports are written")
+    parser.add_argument("--db-path", default=None)
+    parser.add_argument("--backend", default=None, choices=("access", "sqlite"))
+    parser.add_argument("--roster", default=None, help="shift roster file instead of shift_hour.json")
+    parser.add_argument("--summary", default=None, help="run summary is written as SUMMARY.run.json (default: next to the job file)")
+    parser.add_argument("--log-level", default=None)
+    args = parser.parse_args()
+
+    setup_logging(args.log_level)
+    config["interactive"] = False
+    if args.db_path:
+        config["db_path"] = args.db_path
+    if args.backend:
+        config["db_backend"] = args.backend
+    if args.roster:
+        import roster
+        roster.use_roster_file(args.roster)
+
+    jobs = jobs_from_args(args)
+    if not jobs:
+        parser.error("no jobs given")
+
+    try:
+        results = run_jobs(jobs)
+    finally:
+        close_all_connections()
+
+    write_run_summary(args.summary or args.jobs or "batch_run")
+    failed = [result for result in results if not result["ok"]]
+    for result in results:
+        status = "ok" if result["ok"] else f"FAILED: {result['error']}"
+        print(f"Job {result['job']} {result['type']}: {status}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,256 @@
+"""
+End-to-end benchmark: fetch -> classify -> register write -> daily report, on synthetic data.
+
+    python benchmark.py --sizes 100,1000,10000
+    python benchmark.py --sizes 1000 --save-baseline
+    python benchmark.py --sizes 1000 --baseline benchmark_baseline.json
+
+Every stage records wall time, peak RSS and rows/second. Results are written as
+JSON; when a baseline is given, stages slower than --tolerance are flagged and
+the exit code is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import psutil
+
+import roster
+import synthetic
+from backends import BACKENDS, SQLiteBackend
+from logger import setup_logging
+from utils import close_all_connections, config
+
+
+MONTH = "10/2025"
+REPORT_DATE = "10/06/2025"
+
+
+class _RssSampler(threading.Thread):
+    """Samples process RSS in the background to catch the peak inside a stage."""
+
+    def __init__(self, interval=0.01):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.process = psutil.Process()
+        self.peak = self.process.memory_info().rss
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.peak = max(self.peak, self.process.memory_info().rss)
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.peak = max(self.peak, self.process.memory_info().rss)
+
+
+@contextmanager
+def _stage(results: dict, name: str, rows: int):
+    sampler = _RssSampler()
+    sampler.start()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - start
+        sampler.stop()
+        results[name] = {
+            "wall_s": round(wall, 4),
+            "peak_rss_mb": round(sampler.peak / 2**20, 1),
+            "rows": rows,
+            "rows_per_s": round(rows / wall, 1) if wall else None,
+        }
+
+
+def row_memory(data) -> dict:
+    """
+    Bytes per row for the fetched rows held as AttendanceRow records vs as the
+    dicts the fetchers used to build. Column values are shared by both, so
+    this is the per-row container cost.
+    """
+    import tracemalloc
+    from records import COLUMNS, AttendanceRow
+
+    values = [entry.values() for entry in data]
+    sizes = {}
+    tracemalloc.start()
+    try:
+        for name, build in (
+            ("record", lambda: list(map(AttendanceRow._make, values))),
+            ("dict", lambda: [dict(zip(COLUMNS, row)) for row in values]),
+        ):
+            before = tracemalloc.get_traced_memory()[0]
+            rows = build()
+            sizes[name] = tracemalloc.get_traced_memory()[0] - before
+            del rows
+    finally:
+        tracemalloc.stop()
+
+    count = max(len(values), 1)
+    return {f"{name}_bytes_per_row": round(size / count, 1) for name, size in sizes.items()}
+
+
+class _LatencyBackend(SQLiteBackend):
+    """The SQLite source with a fixed delay per fetch call, standing in for ODBC round trips to the .mdb."""
+    name = "sqlite_latency"
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def fetchmany(self, cursor, size):
+        time.sleep(self.delay)
+        return super().fetchmany(cursor, size)
+
+    def fetchall(self, cursor):
+        time.sleep(self.delay)
+        return super().fetchall(cursor)
+
+
+def run_size(employees: int, work_dir: str, seed=0, use_mirror=True, source_latency=0.0) -> dict:
+    from fetcher import fetch_month_attendance, fetching_report, iter_month_attendance
+    from pipeline import prefetch
+    from writer import report_sections, write_batches_to_excel, write_report_streaming, write_to_excel
+
+    data_dir = os.path.join(work_dir, f"n{employees}")
+    paths = synthetic.generate(data_dir, employees=employees, month=MONTH, seed=seed)
+
+    backend = SQLiteBackend.name
+    if source_latency:
+        BACKENDS[_LatencyBackend.name] = _LatencyBackend(source_latency)
+        backend = _LatencyBackend.name
+    config.update(db_backend=backend, db_path=paths["db_path"], use_mirror=use_mirror, interactive=False)
+    roster.use_roster_file(paths["roster_path"])
+    os.chdir(data_dir)  # fetchers drop attendance.json / attendance_report.json in cwd
+
+    def empty_mirror(stage: str):
+        # Every stage starts from an empty mirror, so each one pulls from the source
+        path = os.path.join(data_dir, f"mirror_{stage}.sqlite3")
+        if os.path.exists(path):
+            os.remove(path)
+        config["mirror_path"] = path
+
+    results = {}
+    try:
+        empty_mirror("fetch_month")
+        with _stage(results, "fetch_month", paths["rows"]):
+            data = fetch_month_attendance(MONTH)
+        memory = row_memory(data)
+
+        # Untouched copy of the register for the pipelined stage
+        pipelined_register = os.path.join(data_dir, "register_pipelined.xlsx")
+        shutil.copyfile(paths["register_path"], pipelined_register)
+
+        with _stage(results, "write_register", len(data)):
+            write_to_excel(data, paths["register_path"], open_after=False)
+
+        # Same work as fetch_month + write_register, with the fetch overlapped
+        empty_mirror("fetch_write_pipelined")
+        with _stage(results, "fetch_write_pipelined", paths["rows"]):
+            write_batches_to_excel(prefetch(iter_month_attendance(MONTH)), pipelined_register, open_after=False)
+
+        day_rows = sum(1 for entry in data if entry["Att_month"].strftime("%m/%d/%Y") == REPORT_DATE)
+        del data
+
+        empty_mirror("daily_report")
+        with _stage(results, "daily_report", day_rows):
+            report = fetching_report(REPORT_DATE)
+            write_report_streaming(os.path.join(data_dir, "daily_report.xlsx"), report_sections(report))
+
+    finally:
+        close_all_connections()
+        roster.use_roster_file(None)
+
+    sequential = results["fetch_month"]["wall_s"] + results["write_register"]["wall_s"]
+    pipelining = {
+        "sequential_s": round(sequential, 4),
+        "pipelined_s": results["fetch_write_pipelined"]["wall_s"],
+        "saved_s": round(sequential - results["fetch_write_pipelined"]["wall_s"], 4),
+    }
+    return {
+        "employees": employees, "days": 31, "rows": paths["rows"],
+        "use_mirror": use_mirror, "source_latency_s": source_latency,
+        "row_memory": memory, "pipelining": pipelining, "stages": results,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Stages whose wall time grew by more than tolerance (fraction) over the baseline."""
+    regressions = []
+    old_runs = {run["employees"]: run for run in baseline.get("runs", [])}
+    for run in results["runs"]:
+        old = old_runs.get(run["employees"])
+        if not old:
+            continue
+        for stage, stats in run["stages"].items():
+            old_stats = old["stages"].get(stage)
+            if not old_stats or not old_stats["wall_s"]:
+                continue
+            change = stats["wall_s"] / old_stats["wall_s"] - 1
+            stats["vs_baseline"] = round(change, 3)
+            if change > tolerance:
+                regressions.append(f"{run['employees']} employees / {stage}: {old_stats['wall_s']}s -> {stats['wall_s']}s (+{change:.0%})")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the attendance pipeline on synthetic data.")
+    parser.add_argument("--sizes", default="100,1000,10000", help="comma separated employee counts")
+    parser.add_argument("--out", default="benchmark_results.json")
+    parser.add_argument("--baseline", default=None, help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="also write results to benchmark_baseline.json")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before flagging (0.2 = 20%%)")
+    parser.add_argument("--work-dir", default=None, help="where datasets are generated (default: temp dir)")
+    parser.add_argument("--no-mirror", action="store_true", help="query the source directly instead of through the local mirror")
+    parser.add_argument("--source-latency", type=float, default=0.0,
+                        help="seconds added to every source fetch call, like ODBC round trips to the .mdb (e.g. 0.02)")
+    args = parser.parse_args()
+    setup_logging()  # same sink / level as the entry points, so logging cost is measured too
+
+    cwd = os.getcwd()
+    out_path = os.path.abspath(args.out)
+    work_dir = os.path.abspath(args.work_dir) if args.work_dir else tempfile.mkdtemp(prefix="attendance_bench_")
+
+    results = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "runs": [],
+    }
+    for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        print(f"Benchmarking {size} employees x 31 days ...")
+        run = run_size(size, work_dir, use_mirror=not args.no_mirror, source_latency=args.source_latency)
+        results["runs"].append(run)
+        for stage, stats in run["stages"].items():
+            print(f"  {stage:<22} {stats['wall_s']:>9.3f}s  {stats['peak_rss_mb']:>8.1f} MB  {stats['rows_per_s']} rows/s")
+        pipelining = run["pipelining"]
+        print(f"  {'pipelining':<22} {pipelining['pipelined_s']:>9.3f}s vs {pipelining['sequential_s']:.3f}s fetch then write ({pipelining['saved_s']:+.3f}s saved)")
+        memory = run["row_memory"]
+        print(f"  {'row memory':<22} {memory['record_bytes_per_row']:>9.1f} B/row as records, {memory['dict_bytes_per_row']:.1f} B/row as dicts")
+    os.chdir(cwd)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        results["regressions"] = regressions
+
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4)
+    if args.save_baseline:
+        with open("benchmark_baseline.json", "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+    print(f"Results written to {out_path}")
+    for line in regressions:
+        print(f"REGRESSION: {line}")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,212 @@
+import calendar
+import numpy as np
+import pandas as pd
+from records import DAY_SECONDS, MISSING, AttendanceRow, day_ordinal, punch_seconds
+from utils import get_empl_working_hours
+
+
+COLUMNS = ["employee_code", "employee_fname", "In_time", "Out_time", "Att_month"]
+
+# Seconds value (records.punch_seconds) of 1970-01-01 00:00, for datetime64 conversion
+EPOCH_SECONDS = 719163 * DAY_SECONDS
+DAY_ABBR = np.array(list(calendar.day_abbr), dtype=object)  # same names as strftime("%a")
+
+
+def _floor_half(hours):
+    """Round down to nearest 0.5h (same as math.floor(h * 2) / 2)."""
+    return np.floor(hours * 2) / 2
+
+
+def _to_datetime(values: pd.Series) -> pd.Series:
+    # Empty strings / None behave like a missing punch in the scalar code
+    return pd.to_datetime(values.replace("", None), errors="coerce")
+
+
+def _to_seconds(values: pd.Series) -> np.ndarray:
+    """datetime64 column -> records.punch_seconds values (MISSING for NaT)."""
+    seconds = values.to_numpy(dtype="datetime64[s]").astype(np.int64) + EPOCH_SECONDS
+    return np.where(values.isna().to_numpy(), MISSING, seconds)
+
+
+def _from_seconds(seconds: np.ndarray) -> pd.Series:
+    """records.punch_seconds values -> datetime64 column (NaT for MISSING)."""
+    values = (seconds - EPOCH_SECONDS).astype("datetime64[s]")
+    values[seconds == MISSING] = np.datetime64("NaT")
+    return pd.Series(values.astype("datetime64[ns]"))
+
+
+def _punches(rows: list):
+    """
+    Frame of the fetched columns plus in_ts / out_ts / att_day as int arrays.
+    The datetimes of AttendanceRow records are converted straight to integers
+    for the whole batch; plain dict rows (maybe ISO strings) go through pandas.
+    """
+    if rows and isinstance(rows[0], AttendanceRow):
+        in_times, out_times, _, att_months, codes, names = zip(*rows)
+        count = len(rows)
+        in_ts = np.fromiter(map(punch_seconds, in_times), np.int64, count)
+        out_ts = np.fromiter(map(punch_seconds, out_times), np.int64, count)
+        att_day = np.fromiter(map(day_ordinal, att_months), np.int64, count)
+        df = pd.DataFrame({
+            "employee_code": codes,
+            "employee_fname": names,
+            "In_time": _from_seconds(in_ts),
+            "Out_time": _from_seconds(out_ts),
+            "Att_month": _from_seconds(np.where(att_day == MISSING, MISSING, att_day * DAY_SECONDS)),
+        })
+        return df, in_ts, out_ts, att_day
+
+    df = pd.DataFrame.from_records(rows, columns=COLUMNS)
+    for column in ("In_time", "Out_time", "Att_month"):
+        df[column] = _to_datetime(df[column].astype(object))
+    att_day = _to_seconds(df["Att_month"].dt.normalize())
+    att_day = np.where(att_day == MISSING, MISSING, att_day // DAY_SECONDS)
+    return df, _to_seconds(df["In_time"]), _to_seconds(df["Out_time"]), att_day
+
+
+def classify_attendance(rows, shifts: dict | None = None, grace_minutes=20, shift_start=8) -> pd.DataFrame:
+    """
+    Classify a whole day or month of fetched rows in one pass.
+
+    Mirrors writer.write_to_excel / fetcher.fetching_report / utils.calculate_ot_ut
+    and returns one row per input row with:
+        missing_punch  -> in/out time not present (skipped by both callers)
+        status         -> "A", "MIS" or "P"
+        mark           -> register mark ("A" becomes "P" on Sunday / Sunday duty)
+        worked_hours   -> worked hours rounded down to 0.5h
+        ot_ut          -> calculate_ot_ut value (NaN where it returns " ")
+        ot_ut_mark     -> value written in the register OT row
+        is_late, late_minutes, is_early, early_minutes
+        in_ts, out_ts  -> punches as records.punch_seconds integers
+
+    Every rule runs on integer seconds (records.punch_seconds), punches are
+    compared to the second.
+    """
+    df, in_ts, out_ts, att_day = _punches(list(rows))
+    if shifts is None:
+        shifts = get_empl_working_hours(set(df["employee_code"]))
+
+    # --- Roster for every row (one lookup per employee) ---
+    codes = df["employee_code"]
+    df["working_hours"] = codes.map({code: float(shifts[code][0]) for code in set(codes)}).astype(float)
+    df["sunday_duty"] = codes.map({code: bool(shifts[code][1]) for code in set(codes)}).astype(bool)
+
+    missing = (in_ts == MISSING) | (out_ts == MISSING)
+    df["missing_punch"] = missing
+    weekday = (att_day - 1) % 7  # date.fromordinal(n).weekday()
+    day = DAY_ABBR[weekday]
+    day[att_day == MISSING] = np.nan
+    df["day"] = day
+    is_sunday = (weekday == 6) & (att_day != MISSING)
+
+    # --- Status (HH:MM comparisons of the scalar code, on minutes of the day) ---
+    in_minute = in_ts % DAY_SECONDS // 60
+    out_minute = out_ts % DAY_SECONDS // 60
+    in_zero = in_minute == 0
+    out_zero = out_minute == 0
+    same_hm = in_minute == out_minute
+
+    absent = in_zero & out_zero
+    mis = ~absent & (out_zero | same_hm)
+
+    status = np.select([absent, mis], ["A", "MIS"], default="P").astype(object)
+    status[missing] = None
+    df["status"] = status
+
+    sunday_duty = df["sunday_duty"].to_numpy()
+    mark = status.copy()
+    mark[absent & (is_sunday | sunday_duty) & ~missing] = "P"
+    df["mark"] = mark
+
+    # --- Worked hours and OT/UT ---
+    total_hours = np.where(missing, np.nan, (out_ts - in_ts) / 3600)
+    standard_hours = df["working_hours"].to_numpy()
+    grace = grace_minutes / 60
+
+    df["worked_hours"] = _floor_half(total_hours)
+
+    with np.errstate(invalid="ignore"):
+        ot_ut = np.select(
+            [
+                is_sunday & ~sunday_duty,
+                total_hours > standard_hours + grace,
+                total_hours < standard_hours - grace,
+            ],
+            [
+                _floor_half(total_hours),
+                _floor_half(total_hours - standard_hours),
+                -_floor_half(standard_hours - total_hours),
+            ],
+            default=np.nan,
+        )
+    present = (status == "P")
+    ot_ut[~present] = np.nan
+    df["ot_ut"] = ot_ut
+
+    ot_ut_mark = np.full(len(df), "", dtype=object)
+    ot_ut_mark[present] = np.array([" " if np.isnan(v) else float(v) for v in ot_ut[present]], dtype=object)
+    df["ot_ut_mark"] = ot_ut_mark
+
+    # --- Late arrival / early leave against the shift window (seconds) ---
+    shift_start_ts = att_day * DAY_SECONDS + int(shift_start) * 3600
+    shift_end_ts = shift_start_ts + standard_hours * 3600
+    grace_seconds = grace_minutes * 60
+
+    # Minutes as timedelta.seconds / 60: whole seconds, within one day
+    is_late = present & (in_ts > shift_start_ts + grace_seconds)
+    df["is_late"] = is_late
+    df["late_minutes"] = np.where(is_late, (in_ts - shift_start_ts) % DAY_SECONDS / 60, 0.0)
+
+    is_early = present & (out_ts < shift_end_ts - grace_seconds)
+    df["is_early"] = is_early
+    df["early_minutes"] = np.where(is_early, np.floor(shift_end_ts - out_ts) % DAY_SECONDS / 60, 0.0)
+
+    df["in_ts"], df["out_ts"] = in_ts, out_ts
+    return df
+
+
+# --- Per-employee month summary ---
+SUMMARY_COLUMNS = ["present_days", "absent_days", "mis_days", "ot_hours", "ut_hours", "late_count", "late_minutes", "early_count"]
+
+
+def summarize_attendance(att: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-employee totals of a classify_attendance() frame, one groupby.
+    Present/absent follow the register mark (a Sunday off counts as present);
+    rows with a missing punch are left out. Every column is a plain sum, so
+    summaries of separate batches can be added up with combine_summaries().
+    """
+    att = att[~att["missing_punch"]]
+    ot_ut = att["ot_ut"].fillna(0.0)
+
+    parts = pd.DataFrame({
+        "employee_code": att["employee_code"],
+        "employee_fname": att["employee_fname"],
+        "present_days": (att["mark"] == "P").astype(int),
+        "absent_days": (att["mark"] == "A").astype(int),
+        "mis_days": (att["status"] == "MIS").astype(int),
+        "ot_hours": ot_ut.clip(lower=0),
+        "ut_hours": (-ot_ut).clip(lower=0),
+        "late_count": att["is_late"].astype(int),
+        "late_minutes": att["late_minutes"],
+        "early_count": att["is_early"].astype(int),
+    })
+    return combine_summaries([parts])
+
+
+def combine_summaries(parts: list[pd.DataFrame]) -> pd.DataFrame:
+    """Add up per-employee summaries (or raw per-row parts) into one row per employee."""
+    parts = [part for part in parts if not part.empty]
+    if not parts:
+        return pd.DataFrame(columns=["employee_code", "employee_fname", *SUMMARY_COLUMNS])
+
+    summary = pd.concat(parts, ignore_index=True).groupby("employee_code", sort=True).agg(
+        employee_fname=("employee_fname", "first"),
+        **{column: (column, "sum") for column in SUMMARY_COLUMNS},
+    )
+    return summary.reset_index()
+
+
+def monthly_summary(rows, shifts: dict | None = None, grace_minutes=20) -> pd.DataFrame:
+    """Summary straight from a fetch_month_attendance() result."""
+    return summarize_attendance(classify_attendance(rows, shifts, grace_minutes=grace_minutes))
@@ -0,0 +1,257 @@
+"""
+Bulk attendance corrections: the batch counterpart of fetcher.update_employee.
+
+A corrections file lists (employee_code, date, status or ot_ut) rows:
+
+    employee_code,date,status,ot_ut
+    1021,10/12/2025,P,
+    1044,10/12/2025,,1.5
+
+(or the same keys as a JSON list of objects). status is A/P, ot_ut is hours
+(positive=OT, negative=UT). Every transition is computed up front, all updates
+go out with one executemany in one transaction, and a single before/after
+report is written.
+"""
+import csv
+import json
+import os
+from datetime import datetime, timedelta
+from logger import logger
+from metrics import stage
+import mirror
+from utils import analysing_att_status, get_backend, get_db_connection, update_attendance_status
+
+
+DATE_FORMATS = ("%m/%d/%Y", "%Y-%m-%d")
+
+RECORDS_QUERY = """
+    SELECT e.employee_code, e.employee_fname, a.Att_month, a.In_time, a.Out_time,
+           a.Tot_Min, a.ot_minute, a.shift_late_minute, a.early_dep_minute
+    FROM FinalDay_Attendance AS a
+    INNER JOIN employees AS e ON a.Emp_id = e.employee_id
+    WHERE a.Att_month >= ? AND a.Att_month < ?
+"""
+RECORD_COLUMNS = ["employee_code", "employee_fname", "Att_month", "In_time", "Out_time",
+                  "Tot_Min", "ot_minute", "shift_late_minute", "early_dep_minute"]
+
+# One statement covers both kinds of change; untouched columns are written back as read
+UPDATE_QUERY = """
+    UPDATE FinalDay_Attendance
+    SET In_time = ?, Out_time = ?, Tot_Min = ?, ot_minute = ?, shift_late_minute = ?, early_dep_minute = ?
+    WHERE Card_Number = ? AND Att_month = ?
+"""
+
+
+def _key(employee_code, att_date: datetime):
+    return str(employee_code).strip(), att_date.date()
+
+
+def _parse_date(value) -> datetime:
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(str(value).strip(), fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"invalid date {value!r}, use mm/dd/yyyy")
+
+
+def _parse_correction(raw: dict) -> dict:
+    """Validate one raw row into {employee_code, date, status, ot_ut}."""
+    code = str(raw.get("employee_code", "")).strip()
+    if not code:
+        raise ValueError("missing employee_code")
+
+    status = str(raw.get("status") or "").strip().upper()
+    ot_ut = raw.get("ot_ut")
+    ot_ut = None if ot_ut in (None, "") else float(ot_ut)
+
+    if status and ot_ut is not None:
+        raise ValueError("give either status or ot_ut, not both")
+    if not status and ot_ut is None:
+        raise ValueError("nothing to change (status or ot_ut required)")
+    if status and status not in ("A", "P"):
+        raise ValueError(f"invalid status {status!r}, only 'A' or 'P' allowed")
+
+    return {"employee_code": code, "date": _parse_date(raw.get("date", "")), "status": status or None, "ot_ut": ot_ut}
+
+
+def load_corrections(path: str) -> tuple[list[dict], list[dict]]:
+    """
+    Read a .csv or .json corrections file.
+    Returns (corrections, rejected); rejected rows carry the line and the reason.
+    """
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if os.path.splitext(path)[1].lower() == ".json":
+            raw_rows = json.load(f)
+        else:
+            raw_rows = list(csv.DictReader(f))
+
+    corrections, rejected = [], []
+    for line, raw in enumerate(raw_rows, start=1):
+        try:
+            corrections.append(_parse_correction(raw))
+        except ValueError as e:
+            rejected.append({"line": line, "raw": raw, "reason": str(e)})
+    return corrections, rejected
+
+
+def _fetch_records(db, cursor, dates) -> dict:
+    """Current records for the span of dates in one query: {(code, date): record dict}."""
+    start = min(dates).replace(hour=0, minute=0, second=0, microsecond=0)
+    end = max(dates).replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    db.execute(cursor, RECORDS_QUERY, (start, end))
+
+    wanted = {date.date() for date in dates}
+    records = {}
+    for row in db.fetchall(cursor):
+        record = dict(zip(RECORD_COLUMNS, row))
+        if record["Att_month"].date() in wanted:
+            records[_key(record["employee_code"], record["Att_month"])] = record
+    return records
+
+
+def plan_corrections(corrections: list[dict], records: dict) -> tuple[dict, list[dict]]:
+    """
+    Work out the new state of every touched record, applying corrections in file
+    order (a later line for the same employee/date sees the earlier one's result).
+    Returns ({key: new record}, skipped).
+    """
+    planned, skipped = {}, []
+
+    for corr in corrections:
+        key = _key(corr["employee_code"], corr["date"])
+        change = f"status -> {corr['status']}" if corr["status"] else f"OT/UT {corr['ot_ut']:+g} h"
+        skip = {"Code": corr["employee_code"], "Date": corr["date"].strftime("%d-%m-%Y"), "Change": change}
+
+        if key not in records:
+            skipped.append({**skip, "Reason": "no record"})
+            continue
+
+        state = dict(planned.get(key) or records[key])
+        in_time, out_time = state["In_time"], state["Out_time"]
+        if not in_time or not out_time:
+            skipped.append({**skip, "Reason": "missing punch"})
+            continue
+        current_status = analysing_att_status(in_time, out_time)
+
+        if corr["status"]:
+            if current_status == corr["status"]:
+                skipped.append({**skip, "Reason": f"already {current_status}"})
+                continue
+            update_data = update_attendance_status(current_status, corr["status"], corr["date"], in_time)
+            if update_data is None:
+                skipped.append({**skip, "Reason": f"unsupported {current_status} -> {corr['status']}"})
+                continue
+            state["In_time"], state["Out_time"], state["Tot_Min"] = update_data
+
+        else:
+            if current_status != "P":
+                skipped.append({**skip, "Reason": f"not present ({current_status})"})
+                continue
+            state["Out_time"] = out_time + timedelta(hours=corr["ot_ut"])
+            state["Tot_Min"] = int((state["Out_time"] - in_time).total_seconds() / 60)
+            state["ot_minute"] = max(0, corr["ot_ut"])
+            state["shift_late_minute"] = 0
+            state["early_dep_minute"] = 0
+
+        state["changes"] = state.get("changes", []) + [change]
+        planned[key] = state
+
+    return planned, skipped
+
+
+def _update_params(record: dict) -> tuple:
+    return (
+        record["In_time"].strftime("%Y-%m-%d %H:%M:%S"),
+        record["Out_time"].strftime("%Y-%m-%d %H:%M:%S"),
+        record["Tot_Min"],
+        record["ot_minute"],
+        record["shift_late_minute"],
+        record["early_dep_minute"],
+        record["employee_code"],
+        record["Att_month"],
+    )
+
+
+def _report_rows(planned: dict, before: dict, after: dict) -> list[dict]:
+    rows = []
+    for sr_no, (key, state) in enumerate(planned.items(), start=1):
+        old, new = before[key], after.get(key, state)
+        rows.append({
+            "Sr No.": sr_no,
+            "Code": old["employee_code"],
+            "Employee": old["employee_fname"],
+            "Date": old["Att_month"].strftime("%d-%m-%Y"),
+            "Change": ", ".join(state["changes"]),
+            "In (before)": old["In_time"].strftime("%H:%M"),
+            "Out (before)": old["Out_time"].strftime("%H:%M"),
+            "Total (before)": old["Tot_Min"],
+            "In (after)": new["In_time"].strftime("%H:%M"),
+            "Out (after)": new["Out_time"].strftime("%H:%M"),
+            "Total (after)": new["Tot_Min"],
+            "OT (after)": new["ot_minute"],
+        })
+    return rows
+
+
+def write_corrections_report(report: dict, file_name: str):
+    """Applied and skipped corrections in one workbook (same styling as the daily report)."""
+    from writer import write_report_streaming
+
+    sections = []
+    for title, rows in (("Applied corrections", report["applied"]), ("Skipped corrections", report["skipped"])):
+        if rows:
+            sections.append((title, list(rows[0].keys()), rows))
+    write_report_streaming(file_name, sections)
+
+
+def apply_corrections(path: str, report_file: str | None = "Corrections Report.xlsx", dry_run=False) -> dict:
+    """
+    Apply every correction in the file in one transaction (rolled back on any
+    error) and return {"applied": [...], "skipped": [...]}. With dry_run the
+    plan is reported but nothing is written to the database.
+    """
+    corrections, rejected = load_corrections(path)
+    skipped = [{"Code": r["raw"].get("employee_code", ""), "Date": r["raw"].get("date", ""), "Change": f"line {r['line']}", "Reason": r["reason"]}
+               for r in rejected]
+    report = {"applied": [], "skipped": skipped}
+
+    if not corrections:
+        logger.warning(f"No valid corrections in {path}")
+    else:
+        db = get_backend()
+        conn, cursor = get_db_connection()
+        try:
+            before = _fetch_records(db, cursor, [corr["date"] for corr in corrections])
+            planned, plan_skipped = plan_corrections(corrections, before)
+            report["skipped"] += plan_skipped
+
+            after = {}
+            if planned and not dry_run:
+                try:
+                    with stage("apply_corrections", rows=len(planned), skipped=len(report["skipped"])):
+                        db.executemany(cursor, UPDATE_QUERY, [_update_params(state) for state in planned.values()])
+                        conn.commit()
+                except Exception:
+                    conn.rollback()
+                    logger.error("Corrections rolled back, nothing was changed")
+                    raise
+
+                # Committed: a mirror problem is only logged, it can't undo the write
+                for att_date in {state["Att_month"] for state in planned.values()}:
+                    mirror.invalidate(att_date)
+
+                # === Re-read the touched records for confirmation ===
+                after = _fetch_records(db, cursor, [state["Att_month"] for state in planned.values()])
+
+            report["applied"] = _report_rows(planned, before, after)
+        finally:
+            cursor.close()
+
+    action = "Planned (dry run)" if dry_run else "Applied"
+    logger.info(f"{action} {len(report['applied'])} corrections, skipped {len(report['skipped'])}")
+
+    if report_file and (report["applied"] or report["skipped"]):
+        write_corrections_report(report, report_file)
+        logger.info(f"Corrections report saved at {report_file}")
+    return report
@@ -1,74 +1,140 @@
 import logging
-import math
 # import time
-import pandas as pd
 import json 
-from logger import logger 
-from pathlib import Path
+from logger import flush_logs, logger 
 from datetime import datetime, timedelta, time
 import os
-from utils import calculate_ot_ut, get_db_connection, get_empl_working_hour, update_attendance_status, analysing_att_status
+import sqlite3
+import mirror
+from metrics import stage
+from records import as_dict, hhmm, make_rows
+from utils import DatabaseUnavailable, calculate_ot_ut, config, day_bounds, get_backend, get_db_connection, is_interactive, month_bounds, get_empl_working_hours, update_attendance_status, analysing_att_status
 
 
 
-def fetch_attendance(date):
-    # Requesting a db connection
-    conn, cursor = get_db_connection()
-    
-    if conn is None or cursor is None:
-        fetch_attendance()
-        return
-    
-    query = f"""
-        SELECT 
-            a.In_time,
-            a.Out_time,
-            a.Emp_id,
-            a.Att_month,
-            e.employee_code,
-            e.employee_fname
-        FROM 
-            FinalDay_Attendance AS a
-        INNER JOIN 
-            employees AS e
-        ON 
-            a.Emp_id = e.employee_id
-        WHERE 
-            a.Att_month = #{date}#;
+# Rows pulled per cursor.fetchmany() call in streaming mode
+FETCH_BATCH_SIZE = 1000
+
+
+def _stream_query(query, params=(), batch_size=FETCH_BATCH_SIZE):
     """
+    Execute query and yield rows as lists of AttendanceRow records (dicts for
+    other column sets), batch_size rows at a time, so peak memory is bounded
+    by the batch and not by the whole result.
+    """
+    # Requesting a cursor on the shared db connection
+    db = get_backend()
+    conn, cursor = get_db_connection()
 
     try:
         logger.info("Executing attendance query...")
-        cursor.execute(query)
+        db.execute(cursor, query, params)
 
         # Fetch column names
         columns = [column[0] for column in cursor.description]
         logger.info(f"Columns fetched: {columns}")
 
-        # Fetch rows
-        rows = cursor.fetchall()
+        while True:
+            rows = db.fetchmany(cursor, batch_size)
+            if not rows:
+                break
+            yield make_rows(columns, rows)
 
-        # Convert to list of dicts
-        data = [dict(zip(columns, row)) for row in rows]
+    finally:
+        cursor.close()
 
-        # Convert to JSON
-        attd_data = json.dumps(data, default=str, indent=4)
-        logger.info("Attendance data converted to JSON.")
-        
-        # Write to file
-        output_file = "attendance.json"
+
+def _collect(batches, output_file="attendance.json"):
+    """
+    Drain a batch stream into one list and persist it as JSON. Fetch errors
+    (DatabaseUnavailable, query errors) propagate to the caller; only a
+    failed JSON write is logged and ignored.
+    """
+    data = []
+    for batch in batches:
+        data.extend(batch)
+
+    # Write to file (records are written as objects, same file as before)
+    try:
         with open(output_file, "w") as f:
-            f.write(attd_data)
+            json.dump([as_dict(entry) for entry in data], f, default=str, indent=4)
+        logger.info("Attendance data converted to JSON.")
+    except (OSError, TypeError, ValueError) as e:
+        logger.error(f"Error while writing {output_file}: {e}")
 
-    except Exception as e:
-        logger.error(f"Error while fetching attendance data: {e}")
-        attd_data = None
+    return data
 
-    finally:
-        cursor.close()
-        conn.close()
-        logger.info("Database connection closed.")
 
+# One parameterised query for every period (day, month, any range):
+# Att_month is compared as a plain half-open range, index friendly, with no
+# MONTH()/YEAR() on the column.
+ATTENDANCE_RANGE_QUERY = """
+    SELECT 
+        a.In_time,
+        a.Out_time,
+        a.Emp_id,
+        a.Att_month,
+        e.employee_code,
+        e.employee_fname
+    FROM 
+        FinalDay_Attendance AS a
+    INNER JOIN 
+        employees AS e
+        ON a.Emp_id = e.employee_id
+    WHERE 
+        a.Att_month >= ? AND a.Att_month < ?
+"""
+
+
+def _as_datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.combine(value, time())
+
+
+def _iter_from_mirror(start, end, batch_size):
+    """
+    Serve [start, end) through the local mirror; None when the mirror itself
+    can't be used. Only the per-date check runs here; changed dates are
+    pulled lazily, one batch at a time, as the caller (or the prefetch
+    thread) iterates. An unreachable database is not retried a second time
+    by the direct query: DatabaseUnavailable propagates.
+    """
+    if not config.get("use_mirror"):
+        return None
+    try:
+        plan = mirror.plan_sync(start, end)
+    except DatabaseUnavailable:
+        raise
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"Local mirror unavailable, querying database directly: {e}")
+        return None
+    return mirror.iter_synced(plan, batch_size)
+
+
+def iter_range(start, end, batch_size=FETCH_BATCH_SIZE):
+    """Yield batches of attendance rows with start <= Att_month < end."""
+    start, end = _as_datetime(start), _as_datetime(end)
+    batches = _iter_from_mirror(start, end, batch_size)
+    if batches is None:
+        batches = _stream_query(ATTENDANCE_RANGE_QUERY, (start, end), batch_size)
+    yield from batches
+
+
+def fetch_range(start, end):
+    """Attendance for any period (week, payroll cycle, ...) in one query."""
+    return _collect(iter_range(start, end))
+
+
+def iter_attendance(date, batch_size=FETCH_BATCH_SIZE):
+    """Streaming variant of fetch_attendance: yields batches of rows."""
+    yield from iter_range(*day_bounds(date), batch_size)
+
+
+def fetch_attendance(date):
+    with stage("fetch_attendance", date=date) as s:
+        data = _collect(iter_attendance(date))
+        s["rows"] = len(data)
     return data
 
 
@@ -77,125 +143,117 @@ def fetching_report(date, grace_min=20):
     Generate a report of late arrivals, early leavers, overtimers, and missing attendance.
     shift_start, shift_end are hours in 24-hour format (int or float)
     """
-    late_arrival = []
-    early_leave = []
-    overtimers = []
-    attendance_miss = []
-
     # Fetch attendance data
     attnd_data = fetch_attendance(date)
 
-    if attnd_data == [] or len(attnd_data) == 0:
+    if (attnd_data == [] or len(attnd_data) == 0) and is_interactive():
         logger.info("No Data found (Press Enter to close): ")
+        flush_logs()
         input("")
     
     if not attnd_data:
         logging.warning("No attendance data found.")
         return
 
-    for entry in attnd_data:
-        emp_id = entry["employee_code"]
-        emp_name = entry["employee_fname"]
-        in_time = entry["In_time"]
-        out_time = entry["Out_time"]
-        att_date = entry["Att_month"]  # assumed full datetime
-        
-        # --- Finding users working hours from json ---
-        shift_start = 8
-        shift_hours, sunday_duty = get_empl_working_hour(emp_id)
+    with stage("fetching_report", date=date, rows=len(attnd_data)) as s:
+        report = build_report(attnd_data, grace_min, counts=s)
+    
+    logger.info("Serializing attendance data structure to JSON and persisting to disk.")
+    with open("attendance_report.json", "w") as f:
+        to_write = json.dumps(report, default=str)
+        f.write(to_write)
         
 
-        # --- Handle missing punches ---
-        if not in_time or not out_time:
-            logging.warning(f"Error encounter for {emp_id}: There is no record of arriving and leave for {emp_name}")
-            continue
+    return report
 
-        # --- Convert strings to datetime safely ---
-        try:
-            if isinstance(in_time, str):
-                in_time = datetime.fromisoformat(in_time)
-            if isinstance(out_time, str):
-                out_time = datetime.fromisoformat(out_time)
-            if isinstance(att_date, str):
-                att_date = datetime.fromisoformat(att_date)
-        except Exception as e:
-            logging.error(f"Time format error for {emp_id} - {emp_name}: {e}")
-            continue
 
-        
-        shift_start_time = datetime.combine(att_date.date(), time(int(shift_start), 0))
-        shift_end_time = datetime.combine(att_date.date(), time(int(shift_start), 0)) + timedelta(hours=shift_hours)
-        working_hour = math.floor(((out_time - in_time).total_seconds() / 3600) * 2) / 2
+def build_report(attnd_data, grace_min=20, shifts=None, counts=None):
+    """
+    Late arrivals, early leavers, overtimers and missing attendance for one
+    day of already fetched rows. shifts is the roster for the rows' employees
+    (looked up when not given); counts, when given, receives the per-section
+    and skipped counts.
+    """
+    late_arrival = []
+    early_leave = []
+    overtimers = []
+    attendance_miss = []
 
-        logger.info(f"<< Report analysing for {emp_id} | {emp_name} >>")
-        
-        if in_time.strftime("%H:%M") == "00:00" and out_time.strftime("%H:%M") == "00:00":
-            logger.info(f"Employee with id {emp_id} is absent")
+    # --- Finding users working hours from json (one lookup for all codes) ---
+    if shifts is None:
+        shifts = get_empl_working_hours({entry["employee_code"] for entry in attnd_data})
+
+    # --- Classify the whole day at once ---
+    from classifier import classify_attendance  # pandas, only on the report path
+    att = classify_attendance(attnd_data, shifts, grace_minutes=grace_min)
+
+    # Per-row lines only with config["log_rows"]; otherwise one summary for the day
+    log_rows = config.get("log_rows")
+    no_record = absent = 0
+
+    for entry in att.itertuples(index=False):
+        emp_id = entry.employee_code
+        emp_name = entry.employee_fname
+
+        # --- Handle missing punches ---
+        if entry.missing_punch:
+            no_record += 1
+            if log_rows:
+                logger.debug("Error encounter for {}: There is no record of arriving and leave for {}", emp_id, emp_name)
+            continue
+
+        row = {
+            "Code": int(emp_id),
+            "Employee": emp_name,
+            "Shift Hours": shifts[emp_id][0],
+            "In time": hhmm(entry.in_ts),
+            "Out time": hhmm(entry.out_ts),
+            "Working Hour": entry.worked_hours,
+        }
+
+        if entry.status == "A":
+            absent += 1
+            if log_rows:
+                logger.debug("Employee with id {} is absent", emp_id)
             continue # skipping those who are absent
-        
+
         # --- Check for missing attendance ---
-        if out_time.strftime("%H:%M") == "00:00" or in_time.strftime("%H:%M") == out_time.strftime("%H:%M"):
-            attendance_miss.append({
-                "Sr No.":len(attendance_miss) + 1,
-                "Code": int(emp_id),
-                "Employee": emp_name,
-                "Shift Hours": shift_hours,
-                "In time": in_time.strftime("%H:%M"),
-                "Out time": out_time.strftime("%H:%M"),
-                "Working Hour": working_hour,
-                "Reason": "MIS"
-            })
-            logger.info(f"Missing Attendance: In Time = 09:05, Out Time = {out_time}")  
+        if entry.status == "MIS":
+            attendance_miss.append({"Sr No.": len(attendance_miss) + 1, **row, "Reason": "MIS"})
+            if log_rows:
+                logger.debug("Missing Attendance: In Time = {}, Out Time = {}", row['In time'], entry.Out_time)
             continue
-            
 
         # --- Check late arrival ---
-        if in_time > shift_start_time + timedelta(minutes=grace_min):  # 5 min grace
-            delay = (in_time - shift_start_time).seconds / 60
-            late_arrival.append({
-                "Sr No.":len(late_arrival) + 1,
-                "Code": int(emp_id),
-                "Employee": emp_name,
-                "Shift Hours": shift_hours,
-                "In time": in_time.strftime("%H:%M"),
-                "Out time": out_time.strftime("%H:%M"),
-                "Working Hour": working_hour,
-                "Late By": timedelta(minutes=delay)
-            })
-            logger.info(f"Later arrival: In Time = 09:05, Out Time = {out_time}, Late by = {timedelta(minutes=delay)}")  
-            
+        if entry.is_late:
+            late_by = timedelta(minutes=entry.late_minutes)
+            late_arrival.append({"Sr No.": len(late_arrival) + 1, **row, "Late By": late_by})
+            if log_rows:
+                logger.debug("Later arrival: In Time = {}, Out Time = {}, Late by = {}", row['In time'], entry.Out_time, late_by)
 
         # --- Check early leave ---
-        if out_time < shift_end_time - timedelta(minutes=grace_min):  # 5 min grace
-            early = (shift_end_time - out_time).seconds / 60
-            early_leave.append({
-                "Sr No.":len(early_leave) + 1,
-                "Code": int(emp_id),
-                "Employee": emp_name,
-                "Shift Hours": shift_hours,
-                "In time": in_time.strftime("%H:%M"),
-                "Out time": out_time.strftime("%H:%M"),
-                "Working Hour": working_hour,
-                "Left Early": timedelta(minutes=early)
-            })
-            logger.info(f"Left Early: In Time = 09:05, Out Time = {out_time}, Left Early by = {timedelta(minutes=early)}")  
-            
+        if entry.is_early:
+            left_early = timedelta(minutes=entry.early_minutes)
+            early_leave.append({"Sr No.": len(early_leave) + 1, **row, "Left Early": left_early})
+            if log_rows:
+                logger.debug("Left Early: In Time = {}, Out Time = {}, Left Early by = {}", row['In time'], entry.Out_time, left_early)
 
         # --- Check overtime or undertime ---
-        ot_ut = calculate_ot_ut(in_time, out_time, att_date.strftime("%a"), sunday_duty, shift_hours, grace_min)
-        if ot_ut not in (0, 0.0, " ") and ot_ut > 0:
-            overtimers.append({
-                "Sr No.":len(overtimers) + 1,
-                "Code": int(emp_id),
-                "Employee": emp_name,
-                "Shift Hours": shift_hours,
-                "In time": in_time.strftime("%H:%M"),
-                "Out time": out_time.strftime("%H:%M"),
-                "Working Hour": working_hour,
-                "Overtime": ot_ut
-            })
-            logger.info(f"Over/under: In Time = 09:05, Out Time = {out_time}, Overtime/Undertime = {ot_ut} hrs")  
-            
+        if entry.ot_ut > 0:
+            overtimers.append({"Sr No.": len(overtimers) + 1, **row, "Overtime": entry.ot_ut})
+            if log_rows:
+                logger.debug("Over/under: In Time = {}, Out Time = {}, Overtime/Undertime = {} hrs", row['In time'], entry.Out_time, entry.ot_ut)
+
+    att_date = att["Att_month"].iloc[-1].to_pydatetime()
+    logger.info(
+        "Report {}: {} rows, {} late, {} left early, {} overtime, {} missing attendance, {} absent, {} without in/out record",
+        att_date.date(), len(att), len(late_arrival), len(early_leave), len(overtimers), len(attendance_miss), absent, no_record,
+    )
+    if counts is not None:
+        counts.update(
+            late=len(late_arrival), left_early=len(early_leave), overtime=len(overtimers),
+            missing_attendance=len(attendance_miss), absent=absent, no_record=no_record,
+        )
 
     # --- Combine report ---
     report = {
@@ -205,86 +263,31 @@ def fetching_report(date, grace_min=20):
         "overtimers": overtimers,
         "missing_attendance": attendance_miss
     }
-    
-    logger.info("Serializing attendance data structure to JSON and persisting to disk.")
-    with open("attendance_report.json", "w") as f:
-        to_write = json.dumps(report, default=str)
-        f.write(to_write)
-        
 
     return report
 
     
 
-def fetch_month_attendance(month):
-    # Requesting a db connection
-    conn, cursor = get_db_connection()
-    
-    if conn is None or cursor is None:
-        fetch_attendance()
-        return
-    
-    query = f"""
-    SELECT 
-        a.In_time,
-        a.Out_time,
-        a.Emp_id,
-        a.Att_month,
-        e.employee_code,
-        e.employee_fname
-    FROM 
-        FinalDay_Attendance AS a
-    INNER JOIN 
-        employees AS e
-        ON a.Emp_id = e.employee_id
-    WHERE 
-        MONTH(a.Att_month) = MONTH(#{month}#)
-        AND YEAR(a.Att_month) = YEAR(#{month}#);
-    """
-
+def iter_month_attendance(month, batch_size=FETCH_BATCH_SIZE):
+    """Streaming variant of fetch_month_attendance: yields batches of rows."""
+    yield from iter_range(*month_bounds(month), batch_size)
 
-    try:
-        logger.info("Executing attendance query...")
-        cursor.execute(query)
-
-        # Fetch column names
-        columns = [column[0] for column in cursor.description]
-        logger.info(f"Columns fetched: {columns}")
-
-        # Fetch rows
-        rows = cursor.fetchall()
-
-        # Convert to list of dicts
-        data = [dict(zip(columns, row)) for row in rows]
-
-        # Convert to JSON
-        attd_data = json.dumps(data, default=str, indent=4)
-        logger.info("Attendance data converted to JSON.")
-        
-        # Write to file
-        output_file = "attendance.json"
-        with open(output_file, "w") as f:
-            f.write(attd_data)
-
-    except Exception as e:
-        logger.error(f"Error while fetching attendance data: {e}")
-        attd_data = None
-        
-    finally:
-        cursor.close()
-        conn.close()
-        logger.info("Database connection closed.")
 
+def fetch_month_attendance(month):
+    with stage("fetch_month_attendance", month=month) as s:
+        data = _collect(iter_month_attendance(month))
+        s["rows"] = len(data)
     return data
 
 
 def update_employee(employee_code: int, att_date: datetime):
     """Update employee attendance intelligently (A/P/Miss transitions)."""
     try:
+        db = get_backend()
         conn, cursor = get_db_connection()
 
         # Fetch existing record
-        cursor.execute(f"""
+        db.execute(cursor, f"""
             SELECT 
                 a.In_time, a.Out_time, a.Tot_Min,
                 e.employee_fname, e.employee_code
@@ -293,7 +296,7 @@ def update_employee(employee_code: int, att_date: datetime):
             ON a.Emp_id = e.employee_id
             WHERE e.employee_code = ? AND a.Att_month = ?
         """, (employee_code, att_date))
-        record = cursor.fetchone()
+        record = db.fetchone(cursor)
 
         if not record:
             logger.info(f"No record found for Employee {employee_code} on {att_date.date()}")
@@ -308,6 +311,7 @@ def update_employee(employee_code: int, att_date: datetime):
         print("\nWhat would you like to update?")
         print("1) Attendance status (P/A)")
         print("2) OT/UT value (float: +ve=OT, -ve=UT, 0=None)")
+        flush_logs()
         choice = input("Select option (1/2): ").strip()
 
         if choice == "1": 
@@ -315,6 +319,7 @@ def update_employee(employee_code: int, att_date: datetime):
             current_status = analysing_att_status(in_time, out_time)
             
             # === Get desired update ===
+            flush_logs()
             new_status = input("Enter new attendance status (A/P): ").strip().upper()
             if new_status not in ("A", "P"):
                 logger.error("❌ Invalid input. Only 'A' or 'P' allowed.")
@@ -327,7 +332,7 @@ def update_employee(employee_code: int, att_date: datetime):
             updated_in, updated_out, updated_tot = update_data
             
             # === Update DB ===
-            cursor.execute("""
+            db.execute(cursor, """
                 UPDATE FinalDay_Attendance 
                 SET In_time = ?, Out_time = ?, Tot_Min = ?
                 WHERE Card_Number = ? AND
@@ -340,9 +345,11 @@ def update_employee(employee_code: int, att_date: datetime):
                 att_date
             ))
             conn.commit()
+            mirror.invalidate(att_date)
             logger.info("✅ Attendance status updated in success.")
             
         elif choice == "2":
+            flush_logs()
             ot_ut_val = float(input("Enter OT/UT value in hour (positive=OT, negative=UT, 0=None): "))
             
             current_status = analysing_att_status(in_time, out_time)
@@ -353,7 +360,7 @@ def update_employee(employee_code: int, att_date: datetime):
             out_time += timedelta(hours=ot_ut_val)
             tot_min = int((out_time - in_time).total_seconds() / 60)
             
-            cursor.execute("""
+            db.execute(cursor, """
             UPDATE FinalDay_Attendance 
             SET Out_time = ?, 
                 ot_minute = ?,
@@ -364,6 +371,7 @@ def update_employee(employee_code: int, att_date: datetime):
             AND Att_month = ?
             """, (out_time.strftime("%Y-%m-%d %H:%M:%S"), max(0, ot_ut_val), tot_min, employee_code, att_date))
             conn.commit()
+            mirror.invalidate(att_date)
             logger.info("✅ OT/UT updated successfully.")
         
         else:
@@ -371,7 +379,7 @@ def update_employee(employee_code: int, att_date: datetime):
             return 
 
         # === Fetch updated record for confirmation ===
-        cursor.execute("""
+        db.execute(cursor, """
             SELECT 
                 e.employee_code, e.employee_fname, a.In_time, a.Out_time, a.ot_minute, 
                 a.shift_late_minute, a.early_dep_minute, a.Tot_Min
@@ -380,13 +388,13 @@ def update_employee(employee_code: int, att_date: datetime):
             WHERE e.employee_code = ? AND a.Att_month = ?
         """, (employee_code, att_date))
 
-        updated = cursor.fetchone()
+        updated = db.fetchone(cursor)
         if updated:
             logger.info("\nUpdated Record:")
             logger.info(f"Employee: {updated[1]} ({updated[0]})")
             logger.info(f"In: {updated[2]} | Out: {updated[3]} | OT: {updated[4]} | Late: {updated[5]} | Early: {updated[6]} | Total: {updated[7]}")
 
-        conn.close()
+        cursor.close()
 
     except Exception as e:
         print(f"❌ Error updating record: {e}")
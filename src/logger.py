@@ -1,8 +1,53 @@
-from loguru import logger
-from pretty_json_loguru import setup_json_loguru
+import logging
+import os
 import sys
+from loguru import logger
+
+
+# Level when setup_logging() isn't given one, e.g. ATTENDANCE_LOG_LEVEL=DEBUG
+LOG_LEVEL_ENV = "ATTENDANCE_LOG_LEVEL"
+DEFAULT_LEVEL = "INFO"
+
+
+class _InterceptHandler(logging.Handler):
+    """Route stdlib logging (writer, fetcher, libraries) into the loguru sink."""
+
+    def emit(self, record):
+        try:
+            level = logger.level(record.levelname).name
+        except ValueError:
+            level = record.levelno
+
+        # Find the caller outside the logging module so 'source' points at our code
+        frame, depth = logging.currentframe(), 2
+        while frame and frame.f_code.co_filename == logging.__file__:
+            frame = frame.f_back
+            depth += 1
+        logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
+
+
+def setup_logging(level=None, enqueue=True):
+    """
+    Configure Loguru to serialize logs to JSON and send them to the console.
+    Called by the entry points; importing this module stays cheap and leaves
+    loguru's default handler in place until then.
+
+    level defaults to $ATTENDANCE_LOG_LEVEL, then INFO. With enqueue the sink
+    runs on a background thread, so callers only pay for putting the record
+    on a queue.
+    """
+    from pretty_json_loguru import get_loguru_formatter
+
+    level = (level or os.environ.get(LOG_LEVEL_ENV) or DEFAULT_LEVEL).upper()
+
+    logger.remove()
+    # logger.add(sys.stderr, serialize=True)
+    logger.add(sys.stdout, level=level, format=get_loguru_formatter(), enqueue=enqueue)
+
+    # Same sink and level for the modules that still use stdlib logging
+    logging.basicConfig(handlers=[_InterceptHandler()], level=logger.level(level).no, force=True)
+
 
-# Configure Loguru to serialize logs to JSON and send them to the console
-logger.remove()
-# logger.add(sys.stderr, serialize=True)
-setup_json_loguru(level="DEBUG")
\ No newline at end of file
+def flush_logs():
+    """Wait until queued log lines are written, e.g. before prompting on stdin."""
+    logger.complete()
@@ -0,0 +1,105 @@
+"""
+Per-stage timings and counters for one run, written as a JSON summary next to the output.
+
+    with stage("fetch_attendance", date=date) as s:
+        data = ...
+        s["rows"] = len(data)
+    ...
+    write_run_summary(excile_path)   # -> '<excile_path>.run.json'
+
+Stages are kept in memory for the whole process; entry points call
+start_run() once and write_run_summary() when the output is saved.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from logger import logger
+
+
+_run = {"started": datetime.now(), "stages": []}
+_lock = threading.Lock()  # stages may finish on the prefetch thread
+
+
+def start_run():
+    """Forget earlier stages, e.g. between jobs of one process."""
+    with _lock:
+        _run["started"] = datetime.now()
+        _run["stages"] = []
+
+
+def _record(name: str, duration: float, counters: dict):
+    entry = {"stage": name, "duration_s": round(duration, 4), **counters}
+    with _lock:
+        _run["stages"].append(entry)
+    logger.info("Stage {}: {:.3f}s {}", name, duration, counters)
+
+
+@contextmanager
+def stage(name: str, **counters):
+    """Time the block; counters set on the yielded dict (rows, skipped, bytes, ...) are recorded with it."""
+    start = time.perf_counter()
+    try:
+        yield counters
+    except Exception as e:
+        counters["error"] = str(e)
+        raise
+    finally:
+        _record(name, time.perf_counter() - start, counters)
+
+
+def counted(name: str, batches, **counters):
+    """
+    Pass a batch stream through, recording rows and the time from the first
+    request to the last batch as one stage.
+    """
+    start = time.perf_counter()
+    rows = 0
+    try:
+        for batch in batches:
+            rows += len(batch)
+            yield batch
+    finally:
+        _record(name, time.perf_counter() - start, {**counters, "rows": rows})
+
+
+def file_size(path) -> int | None:
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError):
+        return None
+
+
+def run_summary() -> dict:
+    with _lock:
+        stages = list(_run["stages"])
+
+    totals = {}
+    for entry in stages:
+        totals[entry["stage"]] = round(totals.get(entry["stage"], 0) + entry["duration_s"], 4)
+    return {
+        "started": _run["started"].isoformat(sep=" ", timespec="seconds"),
+        "finished": datetime.now().isoformat(sep=" ", timespec="seconds"),
+        "duration_s": round((datetime.now() - _run["started"]).total_seconds(), 3),
+        "totals_s": totals,
+        "stages": stages,
+    }
+
+
+def write_run_summary(output_path: str) -> str | None:
+    """Write the summary as '<output_path>.run.json'. Remote outputs (URLs) get none."""
+    if not output_path or output_path.startswith(("http://", "https://")):
+        return None
+
+    summary = {"output": output_path, **run_summary()}
+    summary_path = f"{output_path}.run.json"
+    try:
+        with open(summary_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=4, default=str)
+    except OSError as e:
+        logger.warning(f"Could not write run summary {summary_path}: {e}")
+        return None
+    logger.info(f"Run summary saved: {summary_path}")
+    return summary_path
@@ -0,0 +1,260 @@
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+from logger import logger
+from records import AttendanceRow
+from utils import config, get_backend, get_db_connection
+
+
+# Same columns (and order) as the fetch queries in fetcher.py
+COLUMNS = ["In_time", "Out_time", "Emp_id", "Att_month", "employee_code", "employee_fname"]
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS attendance (
+        att_date TEXT NOT NULL,
+        In_time TEXT,
+        Out_time TEXT,
+        Emp_id INTEGER,
+        Att_month TEXT,
+        employee_code,
+        employee_fname TEXT
+    );
+    CREATE INDEX IF NOT EXISTS ix_attendance_date ON attendance (att_date);
+
+    CREATE TABLE IF NOT EXISTS synced_days (
+        att_date TEXT PRIMARY KEY,
+        row_count INTEGER NOT NULL,
+        tot_min_sum REAL,
+        synced_at REAL NOT NULL
+    );
+"""
+
+# Per-date signature of the source: a date is re-pulled only when it changes
+SIGNATURE_QUERY = """
+    SELECT a.Att_month, COUNT(*), SUM(a.Tot_Min)
+    FROM FinalDay_Attendance AS a
+    INNER JOIN employees AS e ON a.Emp_id = e.employee_id
+    WHERE a.Att_month >= ? AND a.Att_month < ?
+    GROUP BY a.Att_month
+"""
+
+DAY_ROWS_QUERY = """
+    SELECT a.In_time, a.Out_time, a.Emp_id, a.Att_month, e.employee_code, e.employee_fname
+    FROM FinalDay_Attendance AS a
+    INNER JOIN employees AS e ON a.Emp_id = e.employee_id
+    WHERE a.Att_month >= ? AND a.Att_month < ?
+"""
+
+INSERT_ROWS = f"INSERT INTO attendance (att_date, {', '.join(COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+
+_local = {"path": None, "conn": None}
+
+
+def default_mirror_path() -> str:
+    base_dir = os.path.dirname(sys.executable if getattr(sys, 'frozen', False) else __file__)
+    return os.path.join(base_dir, "attendance_mirror.sqlite3")
+
+
+def _day_key(value) -> str:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.strftime("%Y-%m-%d")
+
+
+def _to_text(value):
+    return value.isoformat(sep=" ") if isinstance(value, datetime) else value
+
+
+def get_mirror():
+    """Open (once) the local mirror database."""
+    path = config.get("mirror_path") or default_mirror_path()
+    if _local["conn"] is None or _local["path"] != path:
+        # May be synced from the prefetch thread (pipeline.py); one user at a time
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.executescript(SCHEMA)
+        _local["path"], _local["conn"] = path, conn
+    return _local["conn"]
+
+
+def _is_fresh(mirror, start: datetime, end: datetime) -> bool:
+    """Every date in [start, end) was synced less than mirror_ttl seconds ago."""
+    ttl = config.get("mirror_ttl", 0)
+    if not ttl:
+        return False
+
+    days = (end - start).days
+    fresh = mirror.execute(
+        "SELECT COUNT(*) FROM synced_days WHERE att_date >= ? AND att_date < ? AND synced_at >= ?",
+        (_day_key(start), _day_key(end), time.time() - ttl),
+    ).fetchone()[0]
+    return fresh == days
+
+
+def plan_sync(start: datetime, end: datetime) -> dict:
+    """
+    Work out which dates of [start, end) must be re-pulled: those whose
+    (row count, SUM(Tot_Min)) differ from the last sync. Only the per-date
+    signatures are queried here; rows are pulled by iter_synced().
+    """
+    plan = {"start": start, "end": end, "changed": {}, "unchanged": []}
+    mirror = get_mirror()
+    if _is_fresh(mirror, start, end):
+        logger.info(f"Mirror is fresh for {start.date()} .. {end.date()}, skipping source check")
+        return plan
+
+    db = get_backend()
+    conn, cursor = get_db_connection()
+
+    try:
+        db.execute(cursor, SIGNATURE_QUERY, (start, end))
+
+        # Every date of the range gets a signature, empty dates included,
+        # so a fully synced range can be trusted without asking the source
+        source = {}
+        for offset in range((end - start).days):
+            source[_day_key(start + timedelta(days=offset))] = (0, None)
+        for att_month, row_count, tot_min_sum in db.fetchall(cursor):
+            source[_day_key(att_month)] = (row_count, None if tot_min_sum is None else float(tot_min_sum))
+    finally:
+        cursor.close()
+
+    local = {
+        att_date: (row_count, tot_min_sum)
+        for att_date, row_count, tot_min_sum in mirror.execute(
+            "SELECT att_date, row_count, tot_min_sum FROM synced_days WHERE att_date >= ? AND att_date < ?",
+            (_day_key(start), _day_key(end)),
+        )
+    }
+    for day, signature in source.items():
+        if local.get(day) == signature:
+            plan["unchanged"].append(day)
+        else:
+            plan["changed"][day] = signature
+
+    logger.info(f"Mirror plan {start.date()} .. {end.date()}: {sum(1 for count, _ in plan['changed'].values() if count)} dates to re-pull")
+    return plan
+
+
+def _pull_day(mirror, day: str, signature: tuple, now: float, batch_size: int):
+    """
+    Re-pull one changed date from the source, batch_size rows at a time. Each
+    batch is stored and then yielded, so the caller can work on it while the
+    next one is fetched. The date is committed once all its rows are in;
+    leaving early rolls it back and it is pulled again next time.
+    """
+    row_count, tot_min_sum = signature
+    with mirror:
+        mirror.execute("DELETE FROM attendance WHERE att_date = ?", (day,))
+
+        if row_count:
+            db = get_backend()
+            conn, cursor = get_db_connection()
+            try:
+                day_start = datetime.strptime(day, "%Y-%m-%d")
+                db.execute(cursor, DAY_ROWS_QUERY, (day_start, day_start + timedelta(days=1)))
+                while True:
+                    rows = db.fetchmany(cursor, batch_size)
+                    if not rows:
+                        break
+                    mirror.executemany(INSERT_ROWS, [(day, *(_to_text(value) for value in row)) for row in rows])
+                    yield list(map(AttendanceRow._make, rows))
+            finally:
+                cursor.close()
+
+        mirror.execute("INSERT OR REPLACE INTO synced_days VALUES (?, ?, ?, ?)", (day, row_count, tot_min_sum, now))
+
+
+def _rebatch(batches, batch_size: int):
+    """Regroup per-date batches into batch_size ones (small dates would mean many tiny batches)."""
+    pending = []
+    for batch in batches:
+        pending.extend(batch)
+        while len(pending) >= batch_size:
+            yield pending[:batch_size]
+            pending = pending[batch_size:]
+    if pending:
+        yield pending
+
+
+def iter_synced(plan: dict, batch_size=1000):
+    """
+    Yield the planned range as batches of AttendanceRow in date order while
+    syncing it: changed dates stream from the source (and into the mirror)
+    as they are pulled, runs of unchanged dates are read from the mirror.
+    Unlike a sync-then-read, the first batch is ready after batch_size rows.
+    """
+    yield from _rebatch(_iter_synced(plan, batch_size), batch_size)
+
+
+def _iter_synced(plan: dict, batch_size: int):
+    mirror = get_mirror()
+    now = time.time()
+
+    # Unchanged dates are confirmed fresh as of now
+    if plan["unchanged"]:
+        with mirror:
+            mirror.executemany("UPDATE synced_days SET synced_at = ? WHERE att_date = ?", [(now, day) for day in plan["unchanged"]])
+
+    start, end = plan["start"], plan["end"]
+    run_start = None  # first date of the current run of unchanged dates
+    day = start
+    while day < end:
+        signature = plan["changed"].get(_day_key(day))
+        if signature is None:
+            run_start = run_start or day
+        else:
+            if run_start:
+                yield from iter_range(run_start, day, batch_size)
+                run_start = None
+            yield from _pull_day(mirror, _day_key(day), signature, now, batch_size)
+        day += timedelta(days=1)
+
+    if run_start:
+        yield from iter_range(run_start, end, batch_size)
+
+
+def invalidate(att_date):
+    """
+    Force the given date to be re-checked against the source on next sync.
+    Called after a source write was committed, so it never raises: a failure
+    is logged (the date's signature still changes with the write). A no-op
+    when the mirror is disabled.
+    """
+    if not config.get("use_mirror"):
+        return
+    try:
+        mirror = get_mirror()
+        with mirror:
+            mirror.execute("DELETE FROM synced_days WHERE att_date = ?", (_day_key(att_date),))
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"Could not invalidate mirror date {_day_key(att_date)}: {e}")
+
+
+def iter_range(start: datetime, end: datetime, batch_size=1000):
+    """Yield mirrored rows for [start, end) as batches of AttendanceRow, like fetcher._stream_query."""
+    cursor = get_mirror().execute(
+        f"SELECT {', '.join(COLUMNS)} FROM attendance WHERE att_date >= ? AND att_date < ? ORDER BY att_date, rowid",
+        (_day_key(start), _day_key(end)),
+    )
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+
+            parse = datetime.fromisoformat
+            yield [
+                AttendanceRow(
+                    parse(in_time) if in_time else in_time,
+                    parse(out_time) if out_time else out_time,
+                    emp_id,
+                    parse(att_month) if att_month else att_month,
+                    code,
+                    name,
+                )
+                for in_time, out_time, emp_id, att_month, code, name in rows
+            ]
+    finally:
+        cursor.close()
@@ -0,0 +1,228 @@
+"""
+Parity check: classify_attendance / build_report against the original per-row rules.
+
+    python parity_check.py
+    python parity_check.py --rows 50000 --seed 7
+
+The scalar rules of the original writer.write_to_excel / fetcher.fetching_report
+loops (and the datetime version of utils.calculate_ot_ut) are kept here as a
+frozen copy. Randomized rows, with the edge cases the rules branch on (missing
+punches, 00:00, equal HH:MM, Sundays, Sunday duty, odd shift lengths, punches
+past midnight, grace boundaries), go through both. Register marks / OT values
+and all four report sections are compared, for dict rows (some with ISO
+string punches) and for AttendanceRow records. The exit code is 1 on any
+difference.
+"""
+import argparse
+import math
+import random
+import sys
+from datetime import datetime, time, timedelta
+
+
+SHIFT_START = 8
+SHIFT_HOURS = (8.5, 9, 7.75, 12, 8.33, 10.25)
+REPORT_SECTIONS = ("late_arrival", "left_earlie", "overtimers", "missing_attendance")
+
+
+# --- Original scalar rules (do not "fix" these: they define the expected output) ---
+def baseline_ot_ut(in_time, out_time, day, sunday_duty=False, standard_hours=8.5, grace_minutes=20):
+    total_hours = (out_time - in_time).total_seconds() / 3600
+    grace = grace_minutes / 60
+
+    if day.lower() == "sun" and sunday_duty == False:
+        return math.floor(total_hours * 2) / 2
+    elif total_hours > standard_hours + grace:
+        return math.floor((total_hours - standard_hours) * 2) / 2
+    elif total_hours < standard_hours - grace:
+        return -(math.floor((standard_hours - total_hours) * 2) / 2)
+    else:
+        return " "
+
+
+def _parse(value):
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def baseline_marks(rows, shifts) -> list:
+    """(code, day of month, mark, OT cell) per row written by the original write_to_excel loop."""
+    written = []
+    for entry in rows:
+        emp_id = entry["employee_code"]
+        in_time, out_time, att_date = entry["In_time"], entry["Out_time"], entry["Att_month"]
+        if not in_time or not out_time:
+            continue
+        in_time, out_time, att_date = _parse(in_time), _parse(out_time), _parse(att_date)
+
+        actull_day = att_date.strftime("%a")
+        working_hour, sunday_duty = shifts[emp_id]
+        overtime_hours = ""
+        if in_time.strftime("%H:%M") == "00:00" and out_time.strftime("%H:%M") == "00:00":
+            att_mark = "A" if actull_day.lower() != "sun" and sunday_duty == False else "P"
+        elif in_time.strftime("%H:%M") != "00:00" and out_time.strftime("%H:%M") == "00:00":
+            att_mark = "MIS"
+        elif in_time.strftime("%H:%M") == out_time.strftime("%H:%M"):
+            att_mark = "MIS"
+        else:
+            att_mark = "P"
+            overtime_hours = baseline_ot_ut(in_time, out_time, actull_day, sunday_duty=sunday_duty, standard_hours=working_hour)
+        written.append((emp_id, int(in_time.strftime("%d")), att_mark, overtime_hours))
+    return written
+
+
+def baseline_report(rows, shifts, grace_min=20) -> dict:
+    """The four sections of the original fetching_report loop for one day of rows."""
+    report = {section: [] for section in REPORT_SECTIONS}
+    for entry in rows:
+        emp_id, emp_name = entry["employee_code"], entry["employee_fname"]
+        in_time, out_time, att_date = entry["In_time"], entry["Out_time"], entry["Att_month"]
+        shift_hours, sunday_duty = shifts[emp_id]
+        if not in_time or not out_time:
+            continue
+        in_time, out_time, att_date = _parse(in_time), _parse(out_time), _parse(att_date)
+
+        shift_start_time = datetime.combine(att_date.date(), time(SHIFT_START, 0))
+        shift_end_time = shift_start_time + timedelta(hours=shift_hours)
+        working_hour = math.floor(((out_time - in_time).total_seconds() / 3600) * 2) / 2
+        row = {
+            "Code": int(emp_id),
+            "Employee": emp_name,
+            "Shift Hours": shift_hours,
+            "In time": in_time.strftime("%H:%M"),
+            "Out time": out_time.strftime("%H:%M"),
+            "Working Hour": working_hour,
+        }
+
+        if in_time.strftime("%H:%M") == "00:00" and out_time.strftime("%H:%M") == "00:00":
+            continue
+        if out_time.strftime("%H:%M") == "00:00" or in_time.strftime("%H:%M") == out_time.strftime("%H:%M"):
+            missing = report["missing_attendance"]
+            missing.append({"Sr No.": len(missing) + 1, **row, "Reason": "MIS"})
+            continue
+        if in_time > shift_start_time + timedelta(minutes=grace_min):
+            late = report["late_arrival"]
+            late.append({"Sr No.": len(late) + 1, **row, "Late By": timedelta(minutes=(in_time - shift_start_time).seconds / 60)})
+        if out_time < shift_end_time - timedelta(minutes=grace_min):
+            early = report["left_earlie"]
+            early.append({"Sr No.": len(early) + 1, **row, "Left Early": timedelta(minutes=(shift_end_time - out_time).seconds / 60)})
+        ot_ut = baseline_ot_ut(in_time, out_time, att_date.strftime("%a"), sunday_duty, shift_hours, grace_min)
+        if ot_ut not in (0, 0.0, " ") and ot_ut > 0:
+            overtimers = report["overtimers"]
+            overtimers.append({"Sr No.": len(overtimers) + 1, **row, "Overtime": ot_ut})
+    return report
+
+
+# --- Randomized rows ---
+def _punch(rng: random.Random, day: datetime, other: datetime | None = None):
+    choice = rng.random()
+    if choice < 0.05:
+        return None
+    if choice < 0.12:
+        return day + timedelta(seconds=rng.choice((0, 30, 59)))  # 00:00
+    if other is not None and choice < 0.18:
+        return other + timedelta(seconds=rng.randint(0, 59) - other.second)  # same HH:MM
+    if other is not None and choice < 0.24:
+        # Around the shift end +/- grace, to hit the boundaries
+        return day + timedelta(hours=SHIFT_START + rng.choice(SHIFT_HOURS), minutes=rng.choice((-21, -20, -19, 0, 20)), seconds=rng.randint(-1, 1))
+    if other is not None:
+        return other + timedelta(seconds=rng.randint(60, 16 * 3600))  # may pass midnight
+    return day + timedelta(hours=SHIFT_START, minutes=rng.randint(-90, 90), seconds=rng.randint(0, 59))
+
+
+def random_rows(count: int, seed=0, employees=60) -> tuple[list[dict], dict]:
+    rng = random.Random(seed)
+    shifts = {code: (rng.choice(SHIFT_HOURS), rng.random() < 0.2) for code in range(1000, 1000 + employees)}
+    rows = []
+    for _ in range(count):
+        day = datetime(2025, 10, rng.randint(1, 31))
+        in_time = _punch(rng, day)
+        out_time = _punch(rng, day, in_time)
+        code = rng.choice(list(shifts))
+        rows.append({
+            "In_time": in_time, "Out_time": out_time, "Emp_id": code, "Att_month": day,
+            "employee_code": code, "employee_fname": f"Employee {code}",
+        })
+    return rows, shifts
+
+
+def _as_strings(rows: list[dict], rng: random.Random) -> list[dict]:
+    """Some punches as ISO strings, as in rows read back from attendance.json."""
+    return [
+        {**row, **{key: row[key].isoformat(sep=" ") for key in ("In_time", "Out_time") if row[key] and rng.random() < 0.3}}
+        for row in rows
+    ]
+
+
+# --- Comparison ---
+def marks(rows, shifts) -> list:
+    from classifier import classify_attendance
+    att = classify_attendance(rows, shifts)
+    att = att[~att["missing_punch"]]
+    return list(zip(att["employee_code"], att["In_time"].dt.day, att["mark"], att["ot_ut_mark"]))
+
+
+def _same(expected, actual) -> bool:
+    if isinstance(expected, str) or isinstance(actual, str):
+        return type(expected) is type(actual) and expected == actual
+    return expected == actual
+
+
+def _diff(label: str, expected: list, actual: list, limit=5) -> list[str]:
+    problems = []
+    if len(expected) != len(actual):
+        problems.append(f"{label}: {len(expected)} rows expected, {len(actual)} produced")
+    for number, (old, new) in enumerate(zip(expected, actual)):
+        same = (
+            old.keys() == new.keys() and all(_same(old[key], new[key]) for key in old)
+            if isinstance(old, dict) else
+            len(old) == len(new) and all(_same(a, b) for a, b in zip(old, new))
+        )
+        if not same:
+            problems.append(f"{label} row {number}: expected {old}, got {new}")
+            if len(problems) >= limit:
+                break
+    return problems
+
+
+def check(rows: list[dict], shifts: dict, label: str, grace_min=20) -> list[str]:
+    from fetcher import build_report
+
+    problems = _diff(f"{label} marks", baseline_marks(rows, shifts), marks(rows, shifts))
+
+    days = {}
+    for row in rows:
+        days.setdefault(_parse(row["Att_month"]).date(), []).append(row)
+    for day, day_rows in sorted(days.items()):
+        expected = baseline_report(day_rows, shifts, grace_min)
+        actual = build_report(day_rows, grace_min, shifts=shifts)
+        for section in REPORT_SECTIONS:
+            problems += _diff(f"{label} {day} {section}", expected[section], actual[section])
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the vectorized attendance rules with the original scalar ones.")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from logger import setup_logging
+    from records import AttendanceRow, COLUMNS
+
+    setup_logging("WARNING")
+    rows, shifts = random_rows(args.rows, args.seed)
+    records = [AttendanceRow.from_row(tuple(row[key] for key in COLUMNS)) for row in rows]
+
+    problems = []
+    for label, variant in (
+        ("dict", rows),
+        ("dict+str", _as_strings(rows, random.Random(args.seed))),
+        ("record", records),
+    ):
+        found = check(variant, shifts, label)
+        print(f"{label:<10} {len(variant)} rows: {'ok' if not found else f'{len(found)} differences'}")
+        problems += found
+
+    for line in problems[:20]:
+        print(f"MISMATCH: {line}")
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,95 @@
+"""
+Overlap fetching with classification / workbook writing.
+
+prefetch() runs a batch iterator (e.g. fetcher.iter_month_attendance) in a
+background thread and hands batches over through a bounded queue, so the
+next batch is pulled over ODBC while the caller is still writing the last one:
+
+    write_batches_to_excel(prefetch(iter_month_attendance(month)), excile_path)
+
+The queue bound is the backpressure: once max_batches are waiting the fetch
+thread blocks, so memory stays at a few batches however large the period is.
+openpyxl is only ever touched by the consuming thread.
+"""
+import queue
+import threading
+from logger import logger
+
+
+# Batches allowed to wait between the fetch thread and the writer
+PREFETCH_BATCHES = 4
+
+_DONE = object()
+
+
+class _Failed:
+    def __init__(self, error):
+        self.error = error
+
+
+def _produce(batches, q: queue.Queue, stop: threading.Event):
+    def put(item) -> bool:
+        # Blocks while the queue is full, but gives up once the consumer has gone
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        for batch in batches:
+            if not put(batch):
+                break
+        put(_DONE)
+    except Exception as e:
+        put(_Failed(e))
+    finally:
+        # Release the cursor from the thread that used it
+        close = getattr(batches, "close", None)
+        if close:
+            close()
+
+
+class Prefetcher:
+    """
+    Start pulling batches in a background thread right away and iterate over
+    them. Errors in the fetch thread are re-raised in the consumer; close()
+    (or leaving the iterator early and dropping it) stops the fetch thread.
+    """
+
+    def __init__(self, batches, max_batches=PREFETCH_BATCHES):
+        self._queue = queue.Queue(maxsize=max_batches)
+        self._stop = threading.Event()
+        self._producer = threading.Thread(
+            target=_produce, args=(batches, self._queue, self._stop), name="attendance-fetch", daemon=True,
+        )
+        self._producer.start()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._stop.is_set():
+            raise StopIteration
+        item = self._queue.get()
+        if item is _DONE:
+            self.close()
+            raise StopIteration
+        if isinstance(item, _Failed):
+            self.close()
+            logger.error(f"Fetch thread failed: {item.error}")
+            raise item.error
+        return item
+
+    def close(self):
+        self._stop.set()
+        self._producer.join()
+
+    def __del__(self):
+        self._stop.set()
+
+
+def prefetch(batches, max_batches=PREFETCH_BATCHES) -> Prefetcher:
+    return Prefetcher(batches, max_batches)
@@ -0,0 +1,111 @@
+"""
+Compact record for one fetched attendance row.
+
+A NamedTuple (no per-row __dict__, no per-row key table) instead of
+dict(zip(columns, row)). Callers that index rows by column name keep working:
+row["employee_code"], row.get(...), row.keys() and as_dict() behave like the
+old dicts, while new code can use attributes (row.employee_code).
+
+The attendance rules compare punches as integers: in_ts / out_ts are seconds
+since day 0 of the proleptic calendar (date.toordinal() * 86400 + seconds of
+the day) and att_day is the date ordinal of Att_month. A missing punch is
+MISSING. They are not stored on the record (that would more than double its
+size); the classifier converts a whole batch at once, and the record
+properties compute them for a single row.
+"""
+from datetime import datetime
+from typing import NamedTuple
+
+
+DAY_SECONDS = 86400
+MISSING = -1  # punch_seconds / day_ordinal of a missing punch
+
+
+def punch_seconds(value) -> int:
+    """datetime -> toordinal() * 86400 + seconds of the day; MISSING for None / ''."""
+    if not value:
+        return MISSING
+    return value.toordinal() * DAY_SECONDS + value.hour * 3600 + value.minute * 60 + value.second
+
+
+def day_ordinal(value) -> int:
+    return value.toordinal() if value else MISSING
+
+
+def seconds_of_day(ts: int) -> int:
+    return ts % DAY_SECONDS
+
+
+def hhmm(ts: int) -> str:
+    """'HH:MM' of a punch, same as datetime.strftime('%H:%M')."""
+    seconds = ts % DAY_SECONDS
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}"
+
+
+class AttendanceRow(NamedTuple):
+    # Same columns, same order as ATTENDANCE_RANGE_QUERY / mirror.COLUMNS
+    In_time: datetime | None
+    Out_time: datetime | None
+    Emp_id: int
+    Att_month: datetime
+    employee_code: int
+    employee_fname: str
+
+    @classmethod
+    def from_row(cls, row):
+        """Record for one query row (the six columns, in query order)."""
+        return cls._make(row)
+
+    # --- Punches as integers, see the module docstring ---
+    @property
+    def in_ts(self) -> int:
+        return punch_seconds(self.In_time)
+
+    @property
+    def out_ts(self) -> int:
+        return punch_seconds(self.Out_time)
+
+    @property
+    def att_day(self) -> int:
+        return day_ordinal(self.Att_month)
+
+    # --- dict-style compatibility (the columns only, not tuple attributes) ---
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key not in self._fields:
+                raise KeyError(key)
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self._fields else default
+
+    def keys(self):
+        return COLUMNS
+
+    def values(self):
+        return tuple(self)
+
+    def items(self):
+        return zip(COLUMNS, self)
+
+    def as_dict(self) -> dict:
+        return dict(zip(COLUMNS, self))
+
+
+COLUMNS = AttendanceRow._fields
+
+
+def as_dict(entry) -> dict:
+    """Plain dict for a record or an already-dict row (json.dump, DataFrames)."""
+    return entry.as_dict() if isinstance(entry, AttendanceRow) else entry
+
+
+def make_rows(columns, rows) -> list:
+    """AttendanceRow per row when the columns are the attendance columns, dicts otherwise."""
+    if tuple(columns) == COLUMNS:
+        return list(map(AttendanceRow._make, rows))
+    return [dict(zip(columns, row)) for row in rows]
@@ -0,0 +1,74 @@
+import calendar
+from datetime import date
+from openpyxl.worksheet.worksheet import Worksheet
+from logger import logger
+
+
+# --- Register layout ---
+FIRST_EMP_ROW = 8      # first employee block
+ROWS_PER_EMP = 3       # mark, OT/UT, spare
+EMP_CODE_COL = 2       # Col B
+FIRST_DAY_COL = 6      # Col F = day 1
+WEEKDAY_ROW = 7        # "Mon", "Tue", ... above each day column
+
+
+def _key(emp_code) -> str:
+    return str(emp_code).strip()
+
+
+def build_register_index(ws: Worksheet) -> dict:
+    """
+    Scan the register once and return lookup tables:
+    emp_rows   -> {employee code: block row}
+    day_cols   -> {day of month: column}
+    duplicates -> {employee code: [rows...]} for codes listed more than once
+    """
+    emp_rows = {}
+    duplicates = {}
+    for row in range(FIRST_EMP_ROW, ws.max_row, ROWS_PER_EMP):
+        emp_code = ws.cell(row=row, column=EMP_CODE_COL).value
+        if emp_code in (None, ""):
+            continue
+
+        code = _key(emp_code)
+        if code in emp_rows:
+            duplicates.setdefault(code, [emp_rows[code]]).append(row)
+            continue  # first block wins, as the old linear scan did
+        emp_rows[code] = row
+
+    day_cols = {col - FIRST_DAY_COL + 1: col for col in range(FIRST_DAY_COL, ws.max_column + 1)}
+
+    for code, rows in duplicates.items():
+        logger.warning(f"Employee {code} appears more than once in register (rows {rows}), using row {rows[0]}")
+
+    return {"emp_rows": emp_rows, "day_cols": day_cols, "duplicates": duplicates}
+
+
+def find_missing_codes(index: dict, emp_codes) -> list:
+    """Codes from the fetched data that have no block in the register."""
+    return sorted({_key(code) for code in emp_codes} - index["emp_rows"].keys())
+
+
+def check_weekday_headers(ws: Worksheet, index: dict, year: int, month: int) -> list:
+    """Compare the row-7 weekday header with the calendar once for the whole month."""
+    mismatched = []
+    for day in range(1, calendar.monthrange(year, month)[1] + 1):
+        col = index["day_cols"].get(day)
+        if col is None:
+            continue
+
+        actual_day = date(year, month, day).strftime("%a")
+        mention_day_in_excel = ws.cell(row=WEEKDAY_ROW, column=col).value
+        if str(mention_day_in_excel).strip().lower() != actual_day.lower():
+            mismatched.append(day)
+            logger.warning(f"Please Correct the Day in excel for this date - {date(year, month, day).strftime('%B %d, %Y')}")
+
+    return mismatched
+
+
+def employee_row(index: dict, emp_code) -> int | None:
+    return index["emp_rows"].get(_key(emp_code))
+
+
+def date_column(index: dict, day: int) -> int | None:
+    return index["day_cols"].get(day)
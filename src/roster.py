@@ -0,0 +1,74 @@
+import json
+import os
+import sys
+from typing import Iterable, Tuple
+from logger import logger
+
+
+DEFAULT_WORKING_HOURS = 8.5
+DEFAULT_SUNDAY_DUTY = False
+
+# --- In-memory roster, keyed by employee code (as stripped string) ---
+_roster = {
+    "override": None,  # set by use_roster_file(), e.g. for a synthetic dataset
+    "path": None,
+    "mtime": None,
+    "by_code": {},
+}
+
+
+def use_roster_file(path: str | None):
+    """Serve the roster from another file (None restores shift_hour.json)."""
+    _roster["override"] = path
+
+
+def default_roster_path() -> str:
+    """Path of shift_hour.json next to the executable (frozen) or this module."""
+    if _roster["override"]:
+        return _roster["override"]
+    base_dir = os.path.dirname(sys.executable if getattr(sys, 'frozen', False) else __file__)
+    return os.path.join(base_dir, "shift_hour.json")
+
+
+def _key(emp_code) -> str:
+    return str(emp_code).strip()
+
+
+def load_roster(path: str | None = None) -> dict:
+    """
+    Return the roster dict {employee_code: (working_hours, sunday_duty)}.
+    The file is parsed once and only re-read when its mtime changes.
+    """
+    path = path or default_roster_path()
+    mtime = os.path.getmtime(path)
+
+    if _roster["path"] == path and _roster["mtime"] == mtime:
+        return _roster["by_code"]
+
+    with open(path, "r", encoding="utf-8") as r:
+        data = json.load(r)
+
+    by_code = {}
+    for empl in data:
+        by_code[_key(empl["employee_code"])] = (
+            empl.get("working_hours", DEFAULT_WORKING_HOURS),
+            empl.get("sunday_duty", DEFAULT_SUNDAY_DUTY),
+        )
+
+    _roster["path"] = path
+    _roster["mtime"] = mtime
+    _roster["by_code"] = by_code
+    logger.info(f"Loaded shift roster: {len(by_code)} employees from {path}")
+    return by_code
+
+
+def get_shift(emp_code, path: str | None = None) -> Tuple[float, bool]:
+    """(working_hours, sunday_duty) for one employee, defaults when not listed."""
+    return load_roster(path).get(_key(emp_code), (DEFAULT_WORKING_HOURS, DEFAULT_SUNDAY_DUTY))
+
+
+def get_shifts(emp_codes: Iterable, path: str | None = None) -> dict:
+    """Bulk lookup: {emp_code: (working_hours, sunday_duty)} for every given code."""
+    by_code = load_roster(path)
+    default = (DEFAULT_WORKING_HOURS, DEFAULT_SUNDAY_DUTY)
+    return {code: by_code.get(_key(code), default) for code in emp_codes}
@@ -0,0 +1,90 @@
+"""
+Import-time report for the entry points, one line per menu option.
+
+    python startup_report.py
+    python startup_report.py --top 15 --out startup_report.json
+
+Each option's imports run in a fresh interpreter with `-X importtime`; the
+report lists the total import time and the most expensive modules, so a heavy
+import creeping back onto a startup path shows up here.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+# What each menu option imports before it can do its work. Keep in sync with the
+# local imports in attendance_writter.py / attendance_report.py / writer.py.
+OPTIONS = {
+    "attendance_writter: menu": "import attendance_writter",
+    "attendance_writter: 1 day": "import attendance_writter; import fetcher, writer, classifier",
+    "attendance_writter: 2 month": "import attendance_writter; import fetcher, pipeline, writer, classifier",
+    "attendance_writter: 3 update": "import attendance_writter; import fetcher",
+    "attendance_writter: 4 corrections": "import attendance_writter; import corrections, writer",
+    "attendance_report: prompt": "import attendance_report",
+    "attendance_report: report": "import attendance_report; import classifier, writer",
+}
+
+
+def parse_importtime(stderr: str) -> list[dict]:
+    """Rows of `-X importtime` output as {module, self_us, cumulative_us, depth}."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append({
+            "module": name.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+        })
+    return rows
+
+
+def measure(code: str, cwd: str) -> dict:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd, capture_output=True, text=True, stdin=subprocess.DEVNULL,
+    )
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"{code!r} failed:\n{result.stderr[-2000:]}")
+
+    rows = parse_importtime(result.stderr)
+    top_level = [row for row in rows if row["depth"] == 0]
+    return {
+        "code": code,
+        "wall_s": round(wall, 3),
+        "imports_s": round(sum(row["cumulative_us"] for row in top_level) / 1e6, 3),
+        "modules": len(rows),
+        "slowest": sorted(top_level, key=lambda row: row["cumulative_us"], reverse=True),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report import time of every entry-point menu option.")
+    parser.add_argument("--top", type=int, default=8, help="slowest top-level imports listed per option")
+    parser.add_argument("--out", default=None, help="also write the report as JSON")
+    args = parser.parse_args()
+
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    report = {"created": time.strftime("%Y-%m-%d %H:%M:%S"), "python": sys.version.split()[0], "options": {}}
+
+    for option, code in OPTIONS.items():
+        stats = measure(code, src_dir)
+        stats["slowest"] = stats["slowest"][:args.top]
+        report["options"][option] = stats
+
+        print(f"{option:<36} {stats['imports_s']:>7.3f}s imports  {stats['wall_s']:>7.3f}s wall  {stats['modules']:>5} modules")
+        for row in stats["slowest"]:
+            print(f"    {row['cumulative_us'] / 1000:>9.1f} ms  {row['module']}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+        print(f"Report written to {args.out}")
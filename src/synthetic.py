@@ -0,0 +1,183 @@
+"""
+Synthetic attendance data for measuring and testing without the production .mdb.
+
+Builds, at any scale:
+  - an SQLite database with the FinalDay_Attendance / employees schema
+  - a matching shift roster (shift_hour.json format)
+  - an empty attendance register workbook for the month
+
+    python synthetic.py --employees 1000 --month 10/2025 --out bench_data
+"""
+import argparse
+import calendar
+import json
+import os
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+
+SCHEMA = """
+    DROP TABLE IF EXISTS FinalDay_Attendance;
+    DROP TABLE IF EXISTS employees;
+
+    CREATE TABLE employees (
+        employee_id INTEGER PRIMARY KEY,
+        employee_code INTEGER NOT NULL,
+        employee_fname TEXT
+    );
+
+    CREATE TABLE FinalDay_Attendance (
+        Emp_id INTEGER NOT NULL,
+        Card_Number INTEGER,
+        Att_month TEXT NOT NULL,
+        In_time TEXT,
+        Out_time TEXT,
+        Tot_Min INTEGER,
+        ot_minute REAL DEFAULT 0,
+        shift_late_minute INTEGER DEFAULT 0,
+        early_dep_minute INTEGER DEFAULT 0
+    );
+    CREATE INDEX ix_att_month ON FinalDay_Attendance (Att_month);
+"""
+
+FIRST_NAMES = ["AMAN", "HONEY", "KARAN", "SHANKY", "HARJEET", "RAVI", "SUNIL", "POOJA", "NEHA", "GURPREET", "VIKAS", "ANJALI"]
+LAST_NAMES = ["SHARMA", "JINDAL", "SINGH", "KUMAR", "MANSA", "BALDEV", "VERMA", "GUPTA"]
+
+
+def _text(value: datetime) -> str:
+    return value.isoformat(sep=" ")
+
+
+def make_employees(count: int, rng: random.Random) -> list[dict]:
+    employees = []
+    for i in range(count):
+        employees.append({
+            "employee_id": i + 1,
+            "employee_code": 1000 + i,
+            "employee_fname": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "working_hours": rng.choice([8.5, 8.5, 8.5, 10, 11]),
+            "sunday_duty": rng.random() < 0.1,
+        })
+    return employees
+
+
+def make_day(emp: dict, day: datetime, rng: random.Random, absent_rate: float, mis_rate: float):
+    """(In_time, Out_time) for one employee-day, in the shapes the terminals produce."""
+    midnight = day.replace(hour=0, minute=0, second=0)
+
+    # Sundays are off unless the employee has Sunday duty (a few come in for OT)
+    if day.weekday() == 6 and not emp["sunday_duty"] and rng.random() > 0.1:
+        return midnight, midnight
+    if rng.random() < absent_rate:
+        return midnight, midnight
+
+    in_time = midnight + timedelta(hours=8, minutes=int(rng.gauss(5, 15)))
+    if rng.random() < mis_rate:
+        # Missed punch: either no out-punch or the same punch twice
+        return (in_time, midnight) if rng.random() < 0.5 else (in_time, in_time)
+
+    worked = timedelta(hours=emp["working_hours"], minutes=int(rng.gauss(0, 60)))
+    return in_time, in_time + worked
+
+
+def generate_database(path: str, employees: list[dict], start: datetime, days: int, seed=0,
+                      absent_rate=0.05, mis_rate=0.03) -> int:
+    """Write employees and `days` days of attendance from `start`. Returns rows written."""
+    rng = random.Random(seed)
+    if os.path.exists(path):
+        os.remove(path)
+
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        "INSERT INTO employees VALUES (?, ?, ?)",
+        [(e["employee_id"], e["employee_code"], e["employee_fname"]) for e in employees],
+    )
+
+    rows = 0
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        batch = []
+        for emp in employees:
+            in_time, out_time = make_day(emp, day, rng, absent_rate, mis_rate)
+            tot_min = max(0, int((out_time - in_time).total_seconds() // 60))
+            batch.append((emp["employee_id"], emp["employee_code"], _text(day), _text(in_time), _text(out_time), tot_min))
+        conn.executemany(
+            "INSERT INTO FinalDay_Attendance (Emp_id, Card_Number, Att_month, In_time, Out_time, Tot_Min) VALUES (?, ?, ?, ?, ?, ?)",
+            batch,
+        )
+        rows += len(batch)
+
+    conn.commit()
+    conn.close()
+    return rows
+
+
+def write_roster(path: str, employees: list[dict]):
+    roster = [
+        {
+            "employee_code": e["employee_code"],
+            "employee_fname": e["employee_fname"],
+            "sunday_duty": e["sunday_duty"],
+            "working_hours": e["working_hours"],
+        }
+        for e in employees
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(roster, f, indent=4)
+
+
+def write_register(path: str, employees: list[dict], month: datetime):
+    """Empty register in the layout write_to_excel expects (see register.py)."""
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws["F3"] = month.strftime("%b").upper()
+
+    for day in range(1, calendar.monthrange(month.year, month.month)[1] + 1):
+        ws.cell(row=7, column=5 + day, value=month.replace(day=day).strftime("%a"))
+
+    row = 8
+    for emp in employees:
+        ws.cell(row=row, column=2, value=emp["employee_code"])
+        ws.cell(row=row, column=3, value=emp["employee_fname"])
+        row += 3
+    ws.cell(row=row, column=1, value="")  # keep the last block inside ws.max_row
+
+    wb.save(path)
+
+
+def generate(out_dir: str, employees=1000, month="10/2025", days=None, seed=0, register=True) -> dict:
+    """Build a complete dataset in out_dir and return the paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    start = datetime.strptime(month, "%m/%Y")
+    days = days or calendar.monthrange(start.year, start.month)[1]
+
+    rng = random.Random(seed)
+    emps = make_employees(employees, rng)
+
+    paths = {
+        "db_path": os.path.join(out_dir, "attendance.sqlite3"),
+        "roster_path": os.path.join(out_dir, "shift_hour.json"),
+        "register_path": os.path.join(out_dir, "register.xlsx") if register else None,
+    }
+    paths["rows"] = generate_database(paths["db_path"], emps, start, days, seed)
+    write_roster(paths["roster_path"], emps)
+    if register:
+        write_register(paths["register_path"], emps, start)
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic attendance dataset.")
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--month", default="10/2025", help="mm/yyyy")
+    parser.add_argument("--days", type=int, default=None, help="defaults to the whole month")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="synthetic_data")
+    args = parser.parse_args()
+
+    result = generate(args.out, args.employees, args.month, args.days, args.seed)
+    print(json.dumps(result, indent=4))
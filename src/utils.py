@@ -1,42 +1,134 @@
-from datetime import datetime
-from io import BytesIO
+from datetime import datetime, timedelta
 import json
 import logging
 import math
 import os
 import sys
-import openpyxl
-import psutil
-import requests
-from logger import logger
-import pyodbc
+import time
+from logger import flush_logs, logger
+from roster import get_shift, get_shifts
+from backends import BACKENDS
+from records import DAY_SECONDS, MISSING, punch_seconds
 
 
 config = {
+    "db_backend": "access",  # "access" (ODBC .mdb) or "sqlite" (see backends.py)
     "db_password": "sss",
     "db_path": r"D:\VS code\AttendanceSync\data\ontime_att.mdb",
     # "db_path": r"D:\VS code\AttendanceSync\data\ACO Factory Att.mdb",
     # "db_path": r"D:\auto_attendancer\data\ontime_att.mdb",
+    # Local SQLite copy of FinalDay_Attendance x employees (see mirror.py)
+    "use_mirror": True,
+    "mirror_path": None,  # defaults to attendance_mirror.sqlite3 next to the executable
+    "mirror_ttl": 60,     # seconds a synced date is trusted without re-checking the source
+    # Connection manager
+    "db_retries": 4,
+    "db_retry_delay": 0.5,       # seconds, doubled after every failed attempt
+    "db_retry_max_delay": 8,
+    "db_health_interval": 30,    # seconds a connection is reused without a health check
+    "interactive": True,         # False for batch runs: never prompt on stdin
+    "excel_pid_ttl": 300,        # seconds the list of running Excel PIDs is reused
+    "log_rows": False,           # one log line per row (DEBUG) instead of per-batch counts
+    # Remote (http/https) registers, see fetch_remote_workbook()
+    "download_cache_dir": None,  # defaults to workbook_cache/ next to the executable
+    "download_timeout": 30,      # seconds for connect / each read
+    "download_max_bytes": 50 * 2**20,
 }
 
 
+class DatabaseUnavailable(Exception):
+    """Raised when the database can't be reached after all retries."""
+
+
+# --- Long-lived connections, one per database path ---
+_connections = {}  # db_path -> {"conn": ..., "checked_at": ...}
+
+
+def get_backend():
+    return BACKENDS[config["db_backend"]]
+
+
+def _connect(db_path):
+    logger.info(f"Connecting to {get_backend().name} database: {db_path}")
+    return get_backend().connect(db_path, config["db_password"])
+
+
+def _is_alive(conn) -> bool:
+    return get_backend().is_alive(conn)
+
+
+def get_connection(db_path=None):
+    """
+    Return the shared connection for db_path, reconnecting when it went stale.
+    Retries with exponential backoff and raises DatabaseUnavailable at the end.
+    """
+    db_path = db_path or config["db_path"]
+    entry = _connections.get(db_path)
+
+    if entry is not None:
+        # Recently validated connections are handed out without a round trip;
+        # checked_at only moves when a health check actually ran, so a busy
+        # connection is still re-checked every db_health_interval
+        if time.monotonic() - entry["checked_at"] < config["db_health_interval"]:
+            return entry["conn"]
+        if _is_alive(entry["conn"]):
+            entry["checked_at"] = time.monotonic()
+            return entry["conn"]
+
+        logger.warning("Database connection went stale, reconnecting.")
+        close_connection(db_path)
+
+    delay = config["db_retry_delay"]
+    for attempt in range(1, config["db_retries"] + 1):
+        try:
+            conn = _connect(db_path)
+            _connections[db_path] = {"conn": conn, "checked_at": time.monotonic()}
+            logger.info("Database connection successful.")
+            return conn
+        except Exception as e:
+            logger.error(f"Failed to connect to database (attempt {attempt}/{config['db_retries']}): {e}")
+            if attempt < config["db_retries"]:
+                time.sleep(delay)
+                delay = min(delay * 2, config["db_retry_max_delay"])
+
+    raise DatabaseUnavailable(f"Could not connect to {db_path}")
+
+
+def close_connection(db_path=None):
+    entry = _connections.pop(db_path or config["db_path"], None)
+    if entry is not None:
+        try:
+            entry["conn"].close()
+        except Exception:
+            pass
+
+
+def close_all_connections():
+    for db_path in list(_connections):
+        close_connection(db_path)
+
+
+def is_interactive() -> bool:
+    """An operator can answer prompts: config allows it and stdin is a terminal."""
+    return bool(config["interactive"] and sys.stdin and sys.stdin.isatty())
+
+
 def get_db_connection():
-    try:
-        logger.info(f"Connecting to Access database: {config["db_path"]}")
-        conn_str = (
-            r'DRIVER={Microsoft Access Driver (*.mdb, *.accdb)};'
-            rf'DBQ={config["db_path"]};'
-            rf'PWD={config["db_password"]};'
-        )
-        conn = pyodbc.connect(conn_str)
-        cursor = conn.cursor()
-        logger.info("Database connection successful.")
-        return conn, cursor
-    except Exception as e:
-        logger.error(f"Failed to connect to database: {e}")
-        db_path = input("Could Not Find DB: Please Provide Database Path:-")
-        config["db_path"] = os.path.normpath(db_path)
-        return None, None
+    """
+    (conn, cursor) on the shared connection. Close only the cursor when done.
+    In an interactive session the operator is asked for a new path when the
+    database can't be reached; batch runs get DatabaseUnavailable instead.
+    """
+    while True:
+        try:
+            conn = get_connection()
+            return conn, conn.cursor()
+        except DatabaseUnavailable:
+            if not is_interactive():
+                raise
+            flush_logs()
+            db_path = input("Could Not Find DB: Please Provide Database Path:-")
+            config["db_path"] = os.path.normpath(db_path.strip().strip('"'))
 
 
 
@@ -44,23 +136,84 @@ def do_something_useful():
     print("Replace this with a utility function")
 
 
+# --- Workbook lock detection ---
+# Excel-named PIDs from the last process walk; open_files() is only asked of these
+_excel_pids = {"pids": [], "scanned_at": 0.0}
+
+
+def _owner_files(file_path) -> list[str]:
+    """Excel's '~$' owner-lock file next to the workbook (long names lose their first 2 chars)."""
+    folder, name = os.path.split(file_path)
+    return [os.path.join(folder, "~$" + name), os.path.join(folder, "~$" + name[2:])]
+
+
+def _open_exclusive_fails(file_path) -> bool:
+    """Windows refuses a read/write open while Excel holds the workbook."""
+    try:
+        with open(file_path, "r+b"):
+            return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+
+
+def is_workbook_locked(file_path) -> bool:
+    """Cheap check, no process scan: exclusive-open probe plus Excel's owner-lock file."""
+    if not os.path.isfile(file_path):
+        return False
+    if _open_exclusive_fails(file_path):
+        return True
+    return any(os.path.exists(owner) for owner in _owner_files(file_path))
+
+
+def _excel_candidates(refresh=False) -> list[int]:
+    import psutil
+    ttl = config.get("excel_pid_ttl", 0)
+    if refresh or time.monotonic() - _excel_pids["scanned_at"] > ttl:
+        # Names only; process names are cheap, open_files() is not
+        _excel_pids["pids"] = [
+            proc.info["pid"] for proc in psutil.process_iter(["pid", "name"])
+            if proc.info["name"] and "excel" in proc.info["name"].lower()
+        ]
+        _excel_pids["scanned_at"] = time.monotonic()
+    return _excel_pids["pids"]
+
+
+def _close_holder(file_name, pids) -> bool:
+    import psutil
+    for pid in pids:
+        try:
+            proc = psutil.Process(pid)
+            # Check if file is locked by this process
+            for f in proc.open_files():
+                if file_name in f.path.lower():
+                    print(f"Closing Excel process (PID {proc.pid}) holding {file_name}")
+                    proc.terminate()
+                    proc.wait(timeout=3)
+                    _excel_pids["pids"] = [p for p in _excel_pids["pids"] if p != pid]
+                    return True
+        except (psutil.AccessDenied, psutil.NoSuchProcess):
+            continue
+    return False
+
+
 def close_excel_if_open(file_path):
-    """Close Excel if this workbook is open."""
+    """
+    Close Excel if this workbook is open.
+    Workbooks nobody holds return straight away; otherwise only the cached Excel
+    PIDs are checked (re-listed once if none of them holds the file).
+    """
+    if not is_workbook_locked(file_path):
+        return False
+
     file_name = os.path.basename(file_path).lower()
-    for proc in psutil.process_iter(['pid', 'name']):
-        if proc.info['name'] and 'excel' in proc.info['name'].lower():
-            try:
-                # Check if file is locked by this process
-                open_files = proc.open_files()
-                for f in open_files:
-                    if file_name in f.path.lower():
-                        print(f"Closing Excel process (PID {proc.pid}) holding {file_name}")
-                        proc.terminate()
-                        proc.wait(timeout=3)
-                        return True
-            except (psutil.AccessDenied, psutil.NoSuchProcess):
-                continue
-    return False
+    scanned_at = _excel_pids["scanned_at"]
+    if _close_holder(file_name, _excel_candidates()):
+        return True
+    if _excel_pids["scanned_at"] != scanned_at:
+        return False  # the PID list was just rebuilt
+    return _close_holder(file_name, _excel_candidates(refresh=True))
 
 
 def open_excel(file_path):
@@ -70,19 +223,102 @@ def open_excel(file_path):
 
 
 
+# --- Remote workbooks: disk cache revalidated with ETag / Last-Modified ---
+def _download_cache_dir() -> str:
+    cache_dir = config.get("download_cache_dir")
+    if not cache_dir:
+        base_dir = os.path.dirname(sys.executable if getattr(sys, 'frozen', False) else __file__)
+        cache_dir = os.path.join(base_dir, "workbook_cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def _cache_paths(url: str) -> tuple[str, str]:
+    import hashlib
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    cache_dir = _download_cache_dir()
+    return os.path.join(cache_dir, f"{key}.xlsx"), os.path.join(cache_dir, f"{key}.json")
+
+
+def fetch_remote_workbook(url: str) -> str:
+    """
+    Local path of an up-to-date copy of the workbook at url.
+    A cached copy is revalidated with a conditional request and reused on 304;
+    otherwise the body is streamed to a temp file (timeout, size limit) and
+    moved into the cache. If the server can't be reached the cached copy is used.
+    """
+    import requests
+
+    file_path, meta_path = _cache_paths(url)
+    meta = {}
+    if os.path.exists(file_path) and os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    timeout = config.get("download_timeout", 30)
+    max_bytes = config.get("download_max_bytes")
+    try:
+        with requests.get(url, headers=headers, stream=True, timeout=timeout) as response:
+            if response.status_code == 304 and meta:
+                logger.info(f"Remote workbook unchanged, using cached copy: {url}")
+                return file_path
+            response.raise_for_status()
+
+            length = response.headers.get("Content-Length")
+            if max_bytes and length and int(length) > max_bytes:
+                raise ValueError(f"Remote workbook is {int(length)} bytes, limit is {max_bytes}")
+
+            # Stream into a temp file in the cache dir, then swap it in
+            size = 0
+            tmp_path = f"{file_path}.{os.getpid()}.part"
+            try:
+                with open(tmp_path, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        size += len(chunk)
+                        if max_bytes and size > max_bytes:
+                            raise ValueError(f"Remote workbook exceeds the {max_bytes} byte limit")
+                        f.write(chunk)
+                os.replace(tmp_path, file_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+            meta = {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "bytes": size,
+                "fetched_at": time.time(),
+            }
+    except requests.RequestException as e:
+        if os.path.exists(file_path):
+            logger.warning(f"Could not revalidate {url} ({e}), using cached copy")
+            return file_path
+        raise
+
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=4)
+    logger.info(f"Downloaded remote workbook: {url} ({size} bytes)")
+    return file_path
+
+
 def load_excel(excile_path: str):
     """
     Load Excel from either local path or online URL.
     Returns workbook object.
     """
+    # openpyxl / requests are only imported by the menu options that touch a workbook
+    import openpyxl
     try :
         if excile_path.startswith("http://") or excile_path.startswith("https://"):
             print("[INFO] Loading online Excel file:", excile_path)
-            response = requests.get(excile_path)
-            print("Content-Type:", response.headers.get("Content-Type"))
-            
-            response.raise_for_status()
-            wb = openpyxl.load_workbook(filename=BytesIO(response.content))
+            wb = openpyxl.load_workbook(filename=fetch_remote_workbook(excile_path))
             
         elif os.path.exists(excile_path):
             print("[INFO] Loading local Excel file:", excile_path)
@@ -92,7 +328,7 @@ def load_excel(excile_path: str):
             raise FileNotFoundError(f"Excel source not found: {excile_path}")
         return wb
     except Exception as e:
-        logging.error("Enable to open exile")
+        logging.error(f"Enable to open exile: {e}")
         return None
         
 
@@ -102,12 +338,25 @@ def round_to_half_hour(hours):
     return round(hours * 2) / 2  # rounds to nearest 0.5
 
 
+def _punch(value: datetime | int) -> int:
+    """
+    Punch as records.punch_seconds; integers are taken as already converted.
+    A missing punch (None / '' / MISSING) raises ValueError instead of being
+    read as a time of day.
+    """
+    seconds = value if isinstance(value, int) else punch_seconds(value)
+    if seconds == MISSING:
+        raise ValueError("Missing in/out punch")
+    return seconds
+
+
 def calculate_ot_ut(in_time, out_time, day, sunday_duty=False, standard_hours=8.5, grace_minutes=20):
     """
     Calculate the working hour undertime and overtime of employees.
+    in_time / out_time are datetimes or records.punch_seconds integers.
     """
     # Total worked hours
-    total_hours = (out_time - in_time).total_seconds() / 3600
+    total_hours = (_punch(out_time) - _punch(in_time)) / 3600
     logging.debug(f"in: {in_time} & Out time:  {out_time} & standar hours: {standard_hours}")
     logging.debug(f"Total hour worked: {total_hours}")
 
@@ -133,18 +382,7 @@ from typing import Tuple
 
 def get_empl_working_hour(emp_code) -> Tuple[int, bool]:
     try:
-        base_dir = os.path.dirname(sys.executable if getattr(sys, 'frozen', False) else __file__)
-        shift_hour_json = os.path.join(base_dir, "shift_hour.json")
-
-        with open(shift_hour_json, "r", encoding="utf-8") as r:
-            # logger.info("Opened shift_hour.json file")
-            data = json.load(r)
-
-            for empl in data:
-                if empl["employee_code"] == emp_code:
-                    return empl["working_hours"], empl["sunday_duty"]
-
-            return 8.5, False
+        return get_shift(emp_code)
 
     except Exception as e:
         logger.error("Unable to find shift_hour.json")
@@ -152,11 +390,52 @@ def get_empl_working_hour(emp_code) -> Tuple[int, bool]:
         return 8.5, False
 
 
+def get_empl_working_hours(emp_codes) -> dict:
+    """
+    Bulk variant of get_empl_working_hour: {emp_code: (working_hours, sunday_duty)}.
+    A missing or unreadable roster raises (FileNotFoundError, ValueError, ...);
+    the entry points decide whether that ends the run.
+    """
+    try:
+        return get_shifts(emp_codes)
+
+    except FileNotFoundError as e:
+        logger.error(f"Unable to find shift roster: {e.filename}")
+        raise
+    except (ValueError, KeyError, TypeError) as e:
+        logger.error(f"Invalid shift roster: {e}")
+        raise
+
+
+
+# --- Non-interactive date parsing (batch runs, job files) ---
+def parse_date(value) -> str:
+    """'mm/dd/yyyy' or 'yyyy-mm-dd' -> 'mm/dd/yyyy'; ValueError otherwise."""
+    value = str(value).strip()
+    for fmt in ("%m/%d/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt).strftime("%m/%d/%Y")
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date {value!r}. Please use mm/dd/yyyy (e.g. 10/08/2025).")
+
+
+def parse_month(value) -> str:
+    """'mm/yyyy' or 'yyyy-mm' -> 'mm/yyyy'; ValueError otherwise."""
+    value = str(value).strip()
+    for fmt in ("%m/%Y", "%Y-%m"):
+        try:
+            return datetime.strptime(value, fmt).strftime("%m/%Y")
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid month {value!r}. Please use mm/yyyy (e.g. 10/2025).")
+
 
 # --- Validate date format before query ---
 def get_valid_date():
     while True:
         try:
+            flush_logs()
             user_input = input("Enter Date (mm/dd/yyyy): ").strip()
             valid_date = datetime.strptime(user_input, "%m/%d/%Y")
             return valid_date.strftime("%m/%d/%Y") 
@@ -164,10 +443,24 @@ def get_valid_date():
             logger.error("❌ Invalid date format. Please use mm/dd/yyyy (e.g. 10/08/2025).")
             
             
+def day_bounds(date: str) -> Tuple[datetime, datetime]:
+    """'mm/dd/yyyy' -> [day 00:00, next day 00:00)"""
+    start = datetime.strptime(date, "%m/%d/%Y")
+    return start, start + timedelta(days=1)
+
+
+def month_bounds(month: str) -> Tuple[datetime, datetime]:
+    """'mm/yyyy' -> [1st of month, 1st of next month)"""
+    start = datetime.strptime(month, "%m/%Y")
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
 # --- Validate date format before query ---
 def get_valid_month():
     while True:
         try:
+            flush_logs()
             user_input = input("Enter Date (mm/yyyy): ").strip()
             valid_date = datetime.strptime(user_input, "%m/%Y")
             return valid_date.strftime("%m/%Y") 
@@ -176,8 +469,6 @@ def get_valid_month():
 
 
 
-from datetime import datetime, timedelta
-
 def update_attendance_status(current_status: str, new_status: str, att_date: datetime, in_time: datetime | None):
     """
     Returns updated (in_time, out_time, total_minutes) tuple based on transition.
@@ -214,11 +505,15 @@ def update_attendance_status(current_status: str, new_status: str, att_date: dat
 
 
 
-def analysing_att_status(in_t: datetime, out_t: datetime):
+def analysing_att_status(in_t: datetime | int, out_t: datetime | int):
+    """A / M / P from the punches; datetimes or records.punch_seconds integers."""
+    in_t, out_t = _punch(in_t), _punch(out_t)
+    in_hour, out_hour = in_t % DAY_SECONDS // 3600, out_t % DAY_SECONDS // 3600
+
     current_status = ""
-    if (in_t.hour == 0 and out_t.hour == 0):
+    if (in_hour == 0 and out_hour == 0):
        current_status = "A"
-    elif in_t == out_t or (in_t.hour != 0 and out_t.hour == 0):
+    elif in_t == out_t or (in_hour != 0 and out_hour == 0):
         current_status = "M"
     else:
         current_status =  "P"
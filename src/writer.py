@@ -1,139 +1,285 @@
-from utils import calculate_ot_ut, close_excel_if_open, get_empl_working_hour, load_excel, open_excel
+from utils import close_excel_if_open, config, get_empl_working_hours, is_interactive, load_excel, open_excel
 from openpyxl.worksheet.worksheet import Worksheet
+from logger import flush_logs
+from metrics import file_size, stage
+from register import build_register_index, check_weekday_headers, date_column, employee_row, find_missing_codes
 import logging
-from datetime import datetime
-import os 
+import math
 import openpyxl.styles as style
+from copy import copy
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.worksheet.cell_range import CellRange
 from openpyxl.utils import get_column_letter
+import calendar
 
 
-# Setup logging
-logging.basicConfig(
-    level=logging.DEBUG,  # Change to INFO for less detail
-    format="%(asctime)s [%(levelname)s] %(message)s"
-)
+# Register sheet month names by month number ("OCT"), as strftime("%b").upper()
+MONTH_ABBR = {number: name.upper() for number, name in enumerate(calendar.month_abbr) if number}
 
 
-def write_to_excel(data, excile_path):
+def open_register(excile_path):
+    """Load the attendance register and index it once. Returns None if it can't be opened."""
     logging.info(f"Opening workbook: {excile_path}")
-    wb = load_excel(excile_path)
-    
+    with stage("load_workbook", path=excile_path) as s:
+        wb = load_excel(excile_path)
+        s["bytes"] = file_size(excile_path)
     if wb == None:
-        new_path = input("Provide Correct excel path: ")
-        if new_path.startswith("\"") and new_path.endswith("\""):
-            new_path = new_path[1:len(new_path)-1]
-            
-        write_to_excel(data, new_path)
-        return
-    
+        return None
+
     ws = wb.active
-    close_excel_if_open(excile_path)
 
     # Get month from Excel sheet (row 3, merged col FGH)
     sheet_month = ws["F3"].value.strip().upper() if ws["F3"].value else None
     logging.info(f"Sheet month: {sheet_month}")
 
-    for entry in data:
-        emp_id = entry["employee_code"]
-        emp_name = entry["employee_fname"]
-        in_time = entry["In_time"]
-        out_time = entry["Out_time"]
-        att_date = entry["Att_month"]  
+    # Employee rows / date columns indexed once for the whole workbook
+    return {
+        "path": excile_path,
+        "wb": wb,
+        "ws": ws,
+        "sheet_month": sheet_month,
+        "index": build_register_index(ws),
+        "reported_missing": set(),
+        "headers_checked": False,
+        "rows": 0,
+        "summary_parts": [],  # per-batch employee totals, see write_month_summary()
+        "period": None,
+        "counts": {"written": 0, "cells_updated": 0, "missing_punch": 0, "not_in_sheet": 0, "no_date_column": 0},
+    }
 
-        logging.debug(f"Processing employee {emp_id} - {emp_name} | Date: {att_date}")
-        
-        # Month check
-        month_str = att_date.strftime("%b").upper()
-        if month_str != sheet_month:
-            logging.error(f"Skipping {emp_id}: Month {month_str} does not match sheet month {sheet_month}")
-            return
 
+def _same_value(old, new) -> bool:
+    """Register cell already holds new: None and "" are both empty, numbers compare numerically."""
+    if old in (None, "") and new in (None, ""):
+        return True
+    numeric = (int, float)
+    if isinstance(old, numeric) and isinstance(new, numeric) and not isinstance(old, bool) and not isinstance(new, bool):
+        return math.isclose(old, new, rel_tol=0, abs_tol=1e-9)
+    return type(old) is type(new) and old == new
 
-        if not in_time or not out_time:
-            logging.warning(f"Skipping {emp_id} - {emp_name}: Missing in/out time")
-            continue
 
-        # Convert to datetime if string
-        if isinstance(in_time, str):
-            in_time = datetime.fromisoformat(in_time)
-        if isinstance(out_time, str):
-            out_time = datetime.fromisoformat(out_time)
-        if isinstance(att_date, str):
-            att_date = datetime.fromisoformat(att_date)
+def _set_if_changed(ws, row: int, column: int, value) -> bool:
+    """Write value only when the cell differs; True when it was written."""
+    cell = ws.cell(row=row, column=column)
+    if _same_value(cell.value, value):
+        return False
+    cell.value = value
+    return True
 
 
-        # Find employee row block (3 rows per employee)
-        emp_row = None
-        for row in range(8, ws.max_row, 3):
-            emp_code = ws.cell(row=row, column=2).value  # Col B
-            if str(emp_code).strip() == str(emp_id).strip():
-                emp_row = row
-                break
+def mark_batch(register: dict, data) -> bool:
+    """
+    Classify one batch of fetched rows and write marks / OT into the register.
+    Returns False when the batch belongs to another month (nothing should be saved).
+    """
+    ws, index, sheet_month = register["ws"], register["index"], register["sheet_month"]
 
-        if not emp_row:
-            logging.warning(f"Employee {emp_id} not found in sheet")
-            continue
-        else:
-            logging.debug(f"Employee row found: {emp_row}")
+    # Users working hour from json, looked up once for every code in the batch
+    shifts = get_empl_working_hours({entry["employee_code"] for entry in data})
+
+    # ===== Apply Attendance Rules (whole batch at once) =====
+    from classifier import classify_attendance, summarize_attendance  # pandas, only when marking
+    att = classify_attendance(data, shifts)
 
+    # Month check (names looked up by month number, same as strftime("%b"))
+    month_str = att["Att_month"].dt.month.map(MONTH_ABBR)
+    wrong_month = att[month_str != sheet_month]
+    if not wrong_month.empty:
+        first = wrong_month.iloc[0]
+        logging.error(f"Skipping {first['employee_code']}: Month {month_str[first.name]} does not match sheet month {sheet_month}")
+        return False
 
-        # Find column for date
-        date_col = None
-        for col in range(6, ws.max_column + 1):  # Starting F=6
-            in_time_date = int(in_time.strftime("%d"));
+    missing_codes = [code for code in find_missing_codes(index, shifts.keys()) if code not in register["reported_missing"]]
+    if missing_codes:
+        register["reported_missing"].update(missing_codes)
+        logging.warning(f"{len(missing_codes)} employees not found in sheet: {', '.join(missing_codes)}")
 
-            if (col-5) == in_time_date:
-                date_col = col
-                break
-        
+    if not att.empty and not register["headers_checked"]:
+        first_date = att["Att_month"].iloc[0]
+        check_weekday_headers(ws, index, first_date.year, first_date.month)
+        register["headers_checked"] = True
+        register["period"] = first_date
+
+    register["summary_parts"].append(summarize_attendance(att))
+
+    # Per-row lines only with config["log_rows"]; otherwise one summary per batch
+    log_rows = config.get("log_rows")
+    counts = dict.fromkeys(register["counts"], 0)
+
+    for emp_id, emp_name, in_time, missing_punch, att_mark, overtime_hours in zip(
+        att["employee_code"], att["employee_fname"], att["In_time"],
+        att["missing_punch"], att["mark"], att["ot_ut_mark"],
+    ):
+        if missing_punch:
+            counts["missing_punch"] += 1
+            if log_rows:
+                logging.debug("Skipping %s - %s: Missing in/out time", emp_id, emp_name)
+            continue
+
+        # Employee row block and date column from the prebuilt index
+        emp_row = employee_row(index, emp_id)
+        if not emp_row:
+            counts["not_in_sheet"] += 1
+            continue  # already reported as missing
+
+        date_col = date_column(index, in_time.day)
         if not date_col:
-            logging.warning(f"Date {in_time.date()} not found for {emp_id}")
+            counts["no_date_column"] += 1
+            if log_rows:
+                logging.debug("Date %s not found for %s", in_time.date(), emp_id)
             continue
-        else:
-            logging.debug(f"Date column found: {date_col}")
-            
-                
-        # Getting the day of attendance date
-        mention_day_in_excel = ws.cell(row=7, column=date_col).value
-        print("{DEBUG} mention_day_in_excel  -> ", mention_day_in_excel)
-        actull_day = att_date.strftime("%a")
-        
-        if mention_day_in_excel.lower() != actull_day.lower():
-            logging.warning(f"Please Correct the Day in excel for this date - {att_date.strftime("%B %d, %Y")}")
-
-        # ===== Apply Attendance Rules =====
-        att_mark = ""
-        overtime_hours = ""
-        working_hour = 8.5
-        sunday_duty = False
-        
-        # Checking users working hour from json
-        working_hour, sunday_duty = get_empl_working_hour(emp_code)
-    
-        if in_time.strftime("%H:%M") == "00:00" and out_time.strftime("%H:%M") == "00:00":
-            att_mark = "A" if actull_day.lower() != "sun" and sunday_duty == False else "P"
-        elif in_time.strftime("%H:%M") != "00:00" and out_time.strftime("%H:%M") == "00:00":
-            att_mark = "MIS"
-        elif in_time.strftime("%H:%M") == out_time.strftime("%H:%M"):
-            att_mark = "MIS"
-        else:
-            att_mark = "P"
-            overtime_hours = calculate_ot_ut(
-                in_time, 
-                out_time, 
-                actull_day, 
-                sunday_duty=sunday_duty, 
-                standard_hours=working_hour
-            )
-            
+
         # ===== Write into Excel =====
-        logging.info(f"Writing for {emp_id} - {emp_name} | {date_col}:{emp_row} | Date: {in_time.date()} | Mark: {att_mark} | OT: {overtime_hours}")
-        ws.cell(row=emp_row, column=date_col, value=att_mark)     
-        ws.cell(row=emp_row + 1, column=date_col, value=overtime_hours)  
+        if log_rows:
+            logging.debug("Writing for %s - %s | %s:%s | Date: %s | Mark: %s | OT: %s", emp_id, emp_name, date_col, emp_row, in_time.date(), att_mark, overtime_hours)
+        # Cells that already hold the value are left alone (cheap re-runs)
+        counts["cells_updated"] += _set_if_changed(ws, emp_row, date_col, att_mark)
+        counts["cells_updated"] += _set_if_changed(ws, emp_row + 1, date_col, overtime_hours)
+        counts["written"] += 1
+
+    logging.info(
+        "Batch of %d rows: %d written (%d cells changed), %d missing in/out time, %d not in sheet, %d without date column",
+        len(att), counts["written"], counts["cells_updated"], counts["missing_punch"], counts["not_in_sheet"], counts["no_date_column"],
+    )
+    if counts["no_date_column"]:
+        logging.warning("%d rows skipped: their date has no column in the sheet", counts["no_date_column"])
 
-    wb.save(excile_path)
+    for key, value in counts.items():
+        register["counts"][key] += value
+    register["rows"] += len(att)
+    return True
+
+
+def save_register(register: dict, open_after=True):
+    excile_path = register["path"]
+    with stage("save_workbook", path=excile_path) as s:
+        register["wb"].save(excile_path)
+        s["bytes"] = file_size(excile_path)
     logging.info(f"Workbook saved: {excile_path}")
-    open_excel(excile_path)
+    if open_after:
+        open_excel(excile_path)
+
+
+def write_batches_to_excel(batches, excile_path, open_after=True, summary=False):
+    """
+    Write attendance to the register while rows are still arriving.
+    batches is any iterable of row lists, e.g. fetcher.iter_month_attendance().
+    With summary, the per-employee month totals go to a "Summary <MON>" sheet.
+    Returns the register path, None when it couldn't be written. A register
+    whose cells already hold every value is neither saved nor opened.
+    """
+    register = open_register(excile_path)
+    
+    if register == None:
+        if not is_interactive():
+            raise FileNotFoundError(f"Unable to open register: {excile_path}")
+        flush_logs()
+        new_path = input("Provide Correct excel path: ")
+        if new_path.startswith("\"") and new_path.endswith("\""):
+            new_path = new_path[1:len(new_path)-1]
+            
+        return write_batches_to_excel(batches, new_path, open_after, summary)
+
+    with stage("write_to_excel", path=excile_path) as s:
+        for batch in batches:
+            if not mark_batch(register, batch):
+                s["month_mismatch"] = True
+                return None
+        if summary and register["rows"]:
+            register["counts"]["cells_updated"] += write_month_summary(register)
+        s.update(rows=register["rows"], **register["counts"])
+
+    if register["rows"] == 0:
+        logging.info("No attendance rows to write.")
+        return None
+
+    if register["counts"]["cells_updated"] == 0:
+        logging.info("Register already up to date, nothing changed: %s", excile_path)
+        return excile_path
+
+    logging.info("%d cells updated", register["counts"]["cells_updated"])
+    close_excel_if_open(excile_path)
+    save_register(register, open_after)
+    return excile_path
+
+
+def write_to_excel(data, excile_path, open_after=True, summary=False):
+    return write_batches_to_excel([data], excile_path, open_after, summary)
+
+
+# --- Monthly summary sheet ---
+SUMMARY_LABELS = {
+    "employee_code": "Code",
+    "employee_fname": "Employee",
+    "present_days": "Present",
+    "absent_days": "Absent",
+    "mis_days": "MIS",
+    "ot_hours": "OT Hours",
+    "ut_hours": "UT Hours",
+    "late_count": "Late",
+    "late_minutes": "Late Minutes",
+    "early_count": "Left Early",
+}
+
+
+def summary_rows(summary) -> list[dict]:
+    """Rows of a classifier summary frame with report labels and plain Python values."""
+    rows = []
+    for sr_no, entry in enumerate(summary.itertuples(index=False), start=1):
+        row = {"Sr No.": sr_no}
+        for column, label in SUMMARY_LABELS.items():
+            value = getattr(entry, column)
+            if column == "employee_code":
+                value = int(value)
+            elif column != "employee_fname":
+                value = float(value) if column in ("ot_hours", "ut_hours", "late_minutes") else int(value)
+            row[label] = value
+        rows.append(row)
+    return rows
+
+
+def _sheet_matches(ws, title: str, data_columns: list[str], data: list[dict]) -> bool:
+    """The sheet already holds this table (laid out by write_report on a fresh sheet)."""
+    expected = [[title], data_columns] + [[entry[key] for key in data_columns] for entry in data]
+    actual = list(ws.iter_rows(min_row=3, max_col=len(data_columns), values_only=True))
+    if len(actual) != len(expected):
+        return False
+    for old_row, new_row in zip(actual, expected):
+        if not all(_same_value(old, new) for old, new in zip(old_row, new_row)):
+            return False
+    return True
+
+
+def write_month_summary(register: dict) -> int:
+    """
+    (Re)write the "Summary <MON>" sheet of the register from the batches marked so far.
+    Returns the number of cells written, 0 when the sheet is already up to date.
+    """
+    from classifier import combine_summaries  # pandas, only when marking
+
+    wb = register["wb"]
+    rows = summary_rows(combine_summaries(register["summary_parts"]))
+    if not rows:
+        return 0
+
+    sheet_name = f"Summary {register['sheet_month']}"
+    period = register["period"]
+    title = f"Monthly Summary - {register['sheet_month']} {period.year}" if period is not None else f"Monthly Summary - {register['sheet_month']}"
+    data_columns = list(rows[0].keys())
+
+    if sheet_name in wb.sheetnames:
+        if _sheet_matches(wb[sheet_name], title, data_columns, rows):
+            logging.info("%s sheet already up to date", sheet_name)
+            return 0
+        wb.remove(wb[sheet_name])
+
+    ws = wb.create_sheet(title=sheet_name)
+    ws.sheet_view.showGridLines = False
+    write_report(ws, title, data_columns, rows)
+    logging.info("%s sheet written: %d employees", sheet_name, len(rows))
+    return len(rows) * len(data_columns)
     
 
 
@@ -143,73 +289,239 @@ thin = style.Side(style="thin", color="000000")
 thick = style.Side(style="thick", color="000000")
 thin_border = style.Border(top=thin, left=thin, right=thin, bottom=thin)
 thick_border = style.Border(top=thick, left=thick, right=thick, bottom=thick)
-    
 
-def write_report(ws: Worksheet, title: str, data_columns: list[str], data: list[dict]):
-    """Writes a report section to the given worksheet with borders, title, and table formatting."""
-    
+
+# --- Named styles for report sections ---
+# Registered once per workbook; cells then just reference them by name instead
+# of carrying their own Font/Alignment/Border objects.
+#   report_title
+#   report_header_<col>
+#   report_cell_<col>_<row>[_center]
+# col: first / middle / last / only (single column table)
+# row: body / last (last data row closes the table with a thick bottom)
+CENTERED_KEYS = ("Shift Hours", "Reason", "Working Hour")
+_COL_SIDES = {"first": (thick, thin), "middle": (thin, thin), "last": (thin, thick), "only": (thick, thick)}
+
+
+def register_report_styles(wb) -> None:
+    """Add the report NamedStyles to wb (no-op when already registered)."""
+    if "report_title" in wb.named_styles:
+        return
+
+    center = style.Alignment(horizontal="center", vertical="center")
+    wb.add_named_style(style.NamedStyle(
+        name="report_title",
+        font=style.Font(bold=True, size=16),
+        alignment=center,
+        border=style.Border(top=thick, left=thick, right=thick, bottom=thin),
+    ))
+
+    for col, (left, right) in _COL_SIDES.items():
+        wb.add_named_style(style.NamedStyle(
+            name=f"report_header_{col}",
+            font=style.Font(bold=True),
+            alignment=center,
+            border=style.Border(left=left, right=right, bottom=thin),
+        ))
+        for row, bottom in (("body", thin), ("last", thick)):
+            border = style.Border(top=thin, left=left, right=right, bottom=bottom)
+            wb.add_named_style(style.NamedStyle(name=f"report_cell_{col}_{row}", font=copy(DEFAULT_FONT), border=border))
+            wb.add_named_style(style.NamedStyle(name=f"report_cell_{col}_{row}_center", font=copy(DEFAULT_FONT), alignment=center, border=border))
+
+
+def _col_position(col_idx: int, no_of_col: int) -> str:
+    if no_of_col == 1:
+        return "only"
+    if col_idx == 1:
+        return "first"
+    return "last" if col_idx == no_of_col else "middle"
+
+
+def _section_styles(data_columns: list[str]) -> tuple[list[str], list[str], list[str]]:
+    """Style names per column for the header row, body rows and the last row."""
+    no_of_col = len(data_columns)
+    header, body, last = [], [], []
+    for col_idx, key in enumerate(data_columns, start=1):
+        col = _col_position(col_idx, no_of_col)
+        suffix = "_center" if key in CENTERED_KEYS else ""
+        header.append(f"report_header_{col}")
+        body.append(f"report_cell_{col}_body{suffix}")
+        last.append(f"report_cell_{col}_last{suffix}")
+    return header, body, last
+
+
+# --- Column widths ---
+MAX_COLUMN_WIDTH = 60
+WIDTH_PADDING = 3
+
+
+class ColumnWidths:
+    """
+    Longest text per column, gathered while rows are written and applied once per sheet.
+    Shared by all sections of a sheet, so widths fit every section, not just the last one.
+    sample_rows caps how many rows of one section are measured (evenly spaced).
+    """
+
+    def __init__(self, max_width=MAX_COLUMN_WIDTH, sample_rows: int | None = None):
+        self.max_width = max_width
+        self.sample_rows = sample_rows
+        self.lengths = {}  # col_idx -> longest str() length
+
+    def _observe(self, col_idx: int, value):
+        length = len(str(value))
+        if length > self.lengths.get(col_idx, 0):
+            self.lengths[col_idx] = length
+
+    def observe_row(self, values):
+        for col_idx, value in enumerate(values, start=1):
+            self._observe(col_idx, value)
+
+    def stride(self, row_count: int) -> int:
+        """Measure every n-th row of a section so at most sample_rows rows are looked at."""
+        if not self.sample_rows or row_count <= self.sample_rows:
+            return 1
+        return -(-row_count // self.sample_rows)
+
+    def observe_section(self, data_columns: list[str], data: list[dict]):
+        self.observe_row(data_columns)
+        for entry in data[::self.stride(len(data))]:
+            self.observe_row([entry.get(key, "") for key in data_columns])
+
+    def apply(self, ws):
+        for col_idx, length in self.lengths.items():
+            # set width slightly larger than max content length
+            ws.column_dimensions[get_column_letter(col_idx)].width = min(length + WIDTH_PADDING, self.max_width)
+
+
+def write_report(ws: Worksheet, title: str, data_columns: list[str], data: list[dict], widths: ColumnWidths | None = None):
+    """
+    Writes a report section to the given worksheet with borders, title, and table formatting.
+    Pass one ColumnWidths for all sections of a sheet and apply() it after the last
+    section; without it the section sizes the columns itself.
+    """
+    with stage("write_report", title=title, rows=len(data)):
+        _write_report_section(ws, title, data_columns, data, widths)
+
+
+def _write_report_section(ws: Worksheet, title: str, data_columns: list[str], data: list[dict], widths: ColumnWidths | None):
     # --- Find next empty row ---
     row_to_write = ws.max_row + 2
     # if row_to_write != 1 and ws.cell(row=row_to_write, column=1).value not in (None, "", " "):
     #     row_to_write += 2  # leave a gap
     
     no_of_col = len(data_columns)
+    register_report_styles(ws.parent)
+    header_styles, body_styles, last_styles = _section_styles(data_columns)
 
     # --- Title Row ---
     ws.merge_cells(start_row=row_to_write, start_column=1, end_row=row_to_write, end_column=no_of_col)
-    title_cell = ws.cell(row=row_to_write, column=1, value=title)
-    title_cell.font = style.Font(bold=True, size=16)
-    title_cell.alignment = style.Alignment(horizontal="center", vertical="center")
     ws.row_dimensions[row_to_write].height = 28
     
-    # Apply thick border around merged title row
+    # Thick border around merged title row
     for col in range(1, no_of_col + 1):
-        ws.cell(row=row_to_write, column=col).border = style.Border(top=thick, left=thick, right=thick, bottom=thin)
+        ws.cell(row=row_to_write, column=col).style = "report_title"
+    ws.cell(row=row_to_write, column=1).value = title
 
     # --- Column Headers ---
     row_to_write += 1
     for col_idx, col_name in enumerate(data_columns, start=1):
-        cell = ws.cell(row=row_to_write, column=col_idx, value=col_name)
-        cell.font = style.Font(bold=True)
-        cell.alignment = style.Alignment(horizontal="center", vertical="center")
+        cell = ws.cell(row=row_to_write, column=col_idx)
+        cell.style = header_styles[col_idx - 1]
+        cell.value = col_name
 
-        # Thicker outer borders
-        left = thick if col_idx == 1 else thin
-        right = thick if col_idx == no_of_col else thin
-        cell.border = style.Border(left=left, right=right, bottom=thin)
+    apply_widths = widths is None
+    if widths is None:
+        widths = ColumnWidths()
+    widths.observe_row(data_columns)
+    stride = widths.stride(len(data))
 
     # --- Data Rows ---
     for i, entry in enumerate(data):
         row_to_write += 1 
-        is_last_row = (i == len(data) - 1)
-        for col_idx, key in enumerate(data_columns, start=1):
-            cell = ws.cell(row=row_to_write, column=col_idx, value=entry[key])
-
-            # Alignment
-            if key in ("Shift Hours", "Reason", "Working Hour"):
-                cell.alignment = style.Alignment(horizontal="center", vertical="center")
-
-            # Border logic
-            left = thick if col_idx == 1 else thin
-            right = thick if col_idx == no_of_col else thin
-            top = thin
-            bottom = thick if is_last_row else thin
+        row_styles = last_styles if i == len(data) - 1 else body_styles
+        values = [entry[key] for key in data_columns]
+        if i % stride == 0:
+            widths.observe_row(values)
 
-            cell.border = style.Border(top=top, left=left, right=right, bottom=bottom)
+        for col_idx, value in enumerate(values, start=1):
+            # style before value, so time values still get their number format
+            cell = ws.cell(row=row_to_write, column=col_idx)
+            cell.style = row_styles[col_idx - 1]
+            cell.value = value
     
     
     
     # --- Auto Adjust Column Widths ---
-    for col_idx, col_name in enumerate(data_columns, start=1):
-        column_letter = get_column_letter(col_idx)  
-        max_length = len(str(col_name))
+    if apply_widths:
+        widths.apply(ws)
 
-        # find max length among all data values in that column
-        for entry in data:
-            value = str(entry.get(col_name, ""))
-            if len(value) > max_length:
-                max_length = len(value)
 
-        # set width slightly larger than max content length
-        ws.column_dimensions[column_letter].width = max_length + 3
-            
+def report_sections(report: dict) -> list[tuple[str, list[str], list[dict]]]:
+    """(title, columns, rows) for every non-empty section of a fetching_report() result."""
+    sections = []
+    for report_type, report_data in report.items():
+        if report_type == 'report_date':  # skipping for date
+            continue
+        if not report_data:
+            logging.info(f"No rows for {report_type}, section skipped")
+            continue
+        sections.append((report_type.replace("_", " ").capitalize(), list(report_data[0].keys()), report_data))
+    return sections
+
+
+def write_report_streaming(file_name: str, sections: list[tuple[str, list[str], list[dict]]], widths: ColumnWidths | None = None):
+    """
+    Write all report sections with an openpyxl write-only workbook.
+    Produces the same layout as calling write_report() once per section on a
+    fresh sheet, but rows are streamed to disk instead of kept as cell objects.
+    """
+    with stage("write_report", path=file_name, sections=len(sections), rows=sum(len(data) for _, _, data in sections)):
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(title="Sheet")
+        ws.sheet_view.showGridLines = False
+
+        # Column widths go out with the sheet header, before the first row is
+        # streamed, so they're measured over all sections up front
+        widths = widths or ColumnWidths()
+        for _, data_columns, data in sections:
+            widths.observe_section(data_columns, data)
+        widths.apply(ws)
+
+        register_report_styles(wb)
+
+        def styled(value, style_name):
+            # style before value, so time values still get their number format
+            cell = WriteOnlyCell(ws)
+            cell.style = style_name
+            cell.value = value
+            return cell
+
+        row_idx = 0
+        for title, data_columns, data in sections:
+            no_of_col = len(data_columns)
+            header_styles, body_styles, last_styles = _section_styles(data_columns)
+
+            # --- Gap before the section (first one starts on row 3) ---
+            for _ in range(2 if row_idx == 0 else 1):
+                ws.append([])
+                row_idx += 1
+
+            # --- Title Row ---
+            row_idx += 1
+            ws.row_dimensions[row_idx].height = 28
+            ws.merged_cells.add(CellRange(min_col=1, min_row=row_idx, max_col=no_of_col, max_row=row_idx))
+            ws.append([styled(title, "report_title")] + [styled(None, "report_title") for _ in range(no_of_col - 1)])
+
+            # --- Column Headers ---
+            row_idx += 1
+            ws.append([styled(col_name, name) for col_name, name in zip(data_columns, header_styles)])
+
+            # --- Data Rows ---
+            for i, entry in enumerate(data):
+                row_idx += 1
+                row_styles = last_styles if i == len(data) - 1 else body_styles
+                ws.append([styled(entry[key], name) for key, name in zip(data_columns, row_styles)])
+
+        with stage("save_workbook", path=file_name) as s:
+            wb.save(file_name)
+            s["bytes"] = file_size(file_name)